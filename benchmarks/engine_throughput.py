@@ -0,0 +1,71 @@
+"""Headless throughput benchmark for QuizEngine.
+
+Plays simulated sessions against a fixed fixture question set (the same
+questions the local OpenTDB stub serves) with no Tk and no network: load,
+shuffle, answer every question at random, score and band the result. Each
+session is also checked against an independently computed score, so the
+script doubles as a logic regression check on headless CI boxes.
+
+    python benchmarks/engine_throughput.py --sessions 20000 --questions 10
+"""
+import argparse
+import random
+import sys
+import time
+
+import harness  # noqa: F401  (puts the repo on sys.path)
+from opentdb import decode_questions
+from opentdb_stub import build_questions
+from quiz_engine import QuizEngine, result_band
+
+def fixture_questions(per_combination):
+    return decode_questions(build_questions(per_combination))
+
+def play_session(questions, question_count, rng):
+    """Play one random session and return (engine, expected_score)"""
+    engine = QuizEngine(question_count, rng=rng)
+    for question in rng.sample(questions, question_count):
+        engine.add_question(question)
+    engine.finish_loading()
+
+    expected_score = 0
+    while not engine.is_complete():
+        choice = rng.choice(engine.current_choices())
+        expected_score += choice == engine.current_question().correct_answer
+        engine.answer(choice)
+        engine.advance()
+    return engine, expected_score
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--questions", type=int, default=10, help="questions per session")
+    parser.add_argument("--seed", type=int, default=1234)
+    args = parser.parse_args()
+
+    questions = fixture_questions(per_combination=20)
+    rng = random.Random(args.seed)
+    bands = {}
+    failures = 0
+
+    started = time.perf_counter()
+    for _ in range(args.sessions):
+        engine, expected_score = play_session(questions, args.questions, rng)
+        result = engine.result()
+        expected_percentage = expected_score / args.questions * 100
+        if (result.score != expected_score or result.total != args.questions
+                or (result.band, result.message) != result_band(expected_percentage)):
+            failures += 1
+        bands[result.band] = bands.get(result.band, 0) + 1
+    elapsed = time.perf_counter() - started
+
+    answers = args.sessions * args.questions
+    print(f"{args.sessions} sessions x {args.questions} questions in {elapsed:.3f} s")
+    print(f"  {args.sessions / elapsed:,.0f} sessions/s, {answers / elapsed:,.0f} answers/s")
+    print("  result bands:", ", ".join(f"{band} {count}" for band, count in sorted(bands.items())))
+    if failures:
+        print(f"FAIL: {failures} sessions scored differently from the reference")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
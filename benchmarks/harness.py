@@ -0,0 +1,49 @@
+"""Shared helpers for the benchmark scripts in this directory."""
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+@contextlib.contextmanager
+def stub_environment(**stub_options):
+    """Point the app at a fresh data directory and an unthrottled local OpenTDB stub"""
+    os.environ["QUIZMASTER_HOME"] = tempfile.mkdtemp(prefix="quizmaster-bench-")
+    stub_options.setdefault("rate_limit", 0)
+
+    from opentdb import client
+    from opentdb_stub import OpenTDBStub
+
+    with OpenTDBStub(**stub_options) as stub:
+        client.base_url = stub.base_url
+        client.scheduler.interval = 0
+        yield stub
+
+def pump_until(root, condition, timeout=10.0):
+    """Process Tk events until condition() is true"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Timed out waiting for the UI")
+        root.update()
+        time.sleep(0.001)
+
+def percentiles(samples):
+    """p50/p95/p99/max of a list of numbers"""
+    ordered = sorted(samples)
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+    return {
+        "p50": statistics.median(ordered),
+        "p95": pick(95),
+        "p99": pick(99),
+        "max": ordered[-1],
+    }
+
+def format_ms(stats):
+    return "  ".join(f"{name} {value * 1000:7.3f} ms" for name, value in stats.items())
@@ -0,0 +1,90 @@
+"""Attempt-history write cost and statistics read latency at kiosk scale.
+
+Fills a temporary history with many logged answers spread over a few years,
+then times a committed record_answer() and the reads the results screen
+makes (running totals, last-week trend and category breakdown). For
+contrast it also times the same overall statistic computed by scanning the
+answer log.
+
+    python benchmarks/history_stats.py --answers 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from harness import format_ms, percentiles
+from history import ALL_PLAYERS, AttemptHistory
+from opentdb import decode_questions
+from opentdb_stub import build_questions
+
+PLAYERS = ["kiosk", "alice", "bob", "carol"]
+YEARS = 3
+
+def fill(history, answer_count, questions, rng):
+    """Log answer_count answers in sessions of 10, committing once"""
+    now = time.time()
+    with history.conn:
+        session_id = None
+        for i in range(answer_count):
+            player = rng.choice(PLAYERS)
+            if i % 10 == 0:
+                session_id = history.conn.execute(
+                    "INSERT INTO sessions (player, started_at) VALUES (?, ?)", (player, now)
+                ).lastrowid
+            answered_at = now - rng.random() * YEARS * 365 * 86400
+            history.apply_answer(session_id, player, rng.choice(questions), rng.random() < 0.6,
+                                 rng.uniform(1, 15), answered_at)
+
+def time_calls(call, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--answers", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    questions = decode_questions(build_questions(20))
+    with tempfile.TemporaryDirectory(prefix="quizmaster-history-") as directory:
+        history = AttemptHistory(os.path.join(directory, "history.db"))
+        started = time.perf_counter()
+        fill(history, args.answers, questions, rng)
+        print(f"logged {args.answers} answers in {time.perf_counter() - started:.1f} s")
+
+        session_id = history.start_session("kiosk", "opentdb", 9, "multiple")
+        writes = time_calls(
+            lambda: history.record_answer(session_id, "kiosk", rng.choice(questions), True, 4.2),
+            args.runs
+        )
+        print(f"record_answer (committed)   {format_ms(percentiles(writes))}")
+
+        def results_screen():
+            history.totals("kiosk")
+            history.recent("kiosk")
+            history.breakdown("kiosk", "category")
+        reads = time_calls(results_screen, args.runs)
+        print(f"results screen statistics   {format_ms(percentiles(reads))}")
+
+        def scan():
+            history.conn.execute(
+                "SELECT COUNT(*), SUM(correct), SUM(response_ms) FROM answers WHERE player = ?",
+                ("kiosk",)
+            ).fetchone()
+        scans = time_calls(scan, max(3, args.runs // 50))
+        print(f"same totals by log scan     {format_ms(percentiles(scans))}")
+
+        overall = history.totals(ALL_PLAYERS)
+        print(f"all players: {overall.answers} answers, {overall.accuracy:.1f}% correct, "
+              f"{overall.mean_response:.1f}s average")
+        history.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Decode time and memory for a large local question set.
+
+Compares the original pipeline (one html.unescape per field into a dict,
+then a (text, correct, answers) tuple per quiz question) with the batched
+decode_questions() stage producing slotted Question objects. Payloads are
+decoded in api.php-sized batches, as the client receives them.
+
+    python benchmarks/question_decode.py --questions 100000
+"""
+import argparse
+import gc
+import html
+import sys
+import time
+import tracemalloc
+
+import harness  # noqa: F401  (puts the repo on sys.path)
+from opentdb import BATCH_SIZE, decode_questions
+from opentdb_stub import DIFFICULTIES, STUB_CATEGORIES, TYPES, build_questions
+
+def legacy_decode(results):
+    """The per-field decode the app used before the Question model"""
+    records = []
+    for q in results:
+        record = {
+            "type": q["type"],
+            "difficulty": q.get("difficulty"),
+            "category": html.unescape(q.get("category", "")),
+            "question": html.unescape(q["question"]),
+            "correct_answer": html.unescape(q["correct_answer"]),
+            "incorrect_answers": [html.unescape(ans) for ans in q["incorrect_answers"]]
+        }
+        records.append((record, (record["question"], record["correct_answer"],
+                                 record["incorrect_answers"] + [record["correct_answer"]])))
+    return records
+
+def decode_all(decode, payloads):
+    decoded = []
+    for payload in payloads:
+        decoded.extend(decode(payload))
+    return decoded
+
+def measure(decode, payloads, runs):
+    """Return (best seconds, bytes retained by the decoded set)"""
+    best = float("inf")
+    for _ in range(runs):
+        gc.collect()
+        started = time.perf_counter()
+        decode_all(decode, payloads)
+        best = min(best, time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    decoded = decode_all(decode, payloads)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del decoded
+    return best, retained
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=3, help="timed runs (best is reported)")
+    args = parser.parse_args()
+
+    combinations = len(STUB_CATEGORIES) * len(TYPES) * len(DIFFICULTIES)
+    raw = build_questions(-(-args.questions // combinations))[:args.questions]
+    payloads = [raw[i:i + BATCH_SIZE] for i in range(0, len(raw), BATCH_SIZE)]
+
+    # Sanity check: both pipelines must agree on every decoded text
+    for (record, _), question in zip(legacy_decode(raw[:500]), decode_questions(raw[:500])):
+        if (record["question"], record["correct_answer"], record["incorrect_answers"]) != \
+                (question.text, question.correct_answer, list(question.incorrect_answers)):
+            print("FAIL: batched decode differs from per-field decode")
+            sys.exit(1)
+
+    print(f"{len(raw)} questions in {len(payloads)} payloads")
+    results = {}
+    for name, decode in (("per-field dicts", legacy_decode), ("batched Questions", decode_questions)):
+        seconds, retained = measure(decode, payloads, args.runs)
+        results[name] = (seconds, retained)
+        print(f"  {name:<18} decode {seconds * 1000:8.1f} ms  "
+              f"({len(raw) / seconds:,.0f}/s)  memory {retained / 2**20:7.1f} MiB")
+
+    (old_s, old_mem), (new_s, new_mem) = results.values()
+    print(f"  speedup {old_s / new_s:.2f}x, memory {new_mem / old_mem:.0%} of before")
+
+if __name__ == "__main__":
+    main()
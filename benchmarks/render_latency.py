@@ -0,0 +1,74 @@
+"""Per-question render and answer feedback latency of QuizWindow.
+
+Times show_question() plus the idle-task layout pass it triggers, cycling
+through a fixture quiz. With --mixed the screen alternates between the
+True/False and multiple choice layouts on every question. Also times showing
+the answer feedback (check_answer) and dismissing it through to the next
+question being on screen.
+
+    python benchmarks/render_latency.py --iterations 2000 --mixed
+
+Needs a display (use xvfb-run on headless machines).
+"""
+import argparse
+import time
+
+from harness import format_ms, percentiles, pump_until, stub_environment
+from opentdb import decode_questions
+from opentdb_stub import build_questions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--mixed", action="store_true", help="alternate boolean and multiple layouts")
+    args = parser.parse_args()
+
+    with stub_environment():
+        import main as quiz_main
+
+        app = quiz_main.QuizApp()
+        quiz = app.show_quiz(9, "multiple", args.questions)
+        engine = quiz.engine
+        pump_until(app.root, lambda: not engine.loading)
+        if args.mixed:
+            # The layout follows each question's type, so alternate the types
+            fixture = decode_questions(build_questions(args.questions))
+            by_type = {kind: [q for q in fixture if q.type == kind] for kind in ("multiple", "boolean")}
+            engine.questions.clear()
+            engine.choices.clear()
+            for i in range(args.questions):
+                engine.add_question(by_type["boolean" if i % 2 else "multiple"][i // 2])
+
+        samples = []
+        feedback_samples = []
+        advance_samples = []
+        for i in range(args.iterations):
+            engine.current_index = i % len(engine.questions)
+            started = time.perf_counter()
+            quiz.show_question()
+            app.root.update_idletasks()
+            samples.append(time.perf_counter() - started)
+
+            correct_answer = engine.current_question().correct_answer
+            started = time.perf_counter()
+            quiz.check_answer(correct_answer)
+            app.root.update_idletasks()
+            feedback_samples.append(time.perf_counter() - started)
+
+            # Rewind so dismissing re-renders the same question instead of finishing
+            engine.current_index -= 1
+            started = time.perf_counter()
+            quiz.dismiss_feedback()
+            app.root.update_idletasks()
+            advance_samples.append(time.perf_counter() - started)
+
+        app.root.destroy()
+
+    layout = "mixed" if args.mixed else "multiple"
+    print(f"show_question ({layout}, {args.iterations} renders): {format_ms(percentiles(samples))}")
+    print(f"answer feedback shown:              {format_ms(percentiles(feedback_samples))}")
+    print(f"feedback dismissed to next question: {format_ms(percentiles(advance_samples))}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Replay a recorded quiz session through the real QuizWindow and time each step.
+
+Loads a recording made with ``main.py --record DIR`` (or builds a synthetic
+one with --synthetic N), then drives QuizWindow with the same questions,
+the same shuffle seed and the same answer events, with no network and a
+throwaway data directory. Reports latency percentiles for rendering a
+question, showing the answer feedback and showing the results.
+
+With --baseline the p95 of each step is compared with a saved run and the
+script exits non-zero if any step regressed by more than --max-regression
+percent (plus --tolerance-ms, which absorbs timer noise on sub-millisecond
+steps). --save-baseline writes the current p95s for later runs.
+
+    python benchmarks/replay_session.py session.json --runs 20 --save-baseline base.json
+    python benchmarks/replay_session.py session.json --runs 20 --baseline base.json
+
+Needs a display (use xvfb-run on headless machines).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from harness import format_ms, percentiles, pump_until
+from opentdb import decode_questions
+from opentdb_stub import build_questions
+from session_record import RecordingError, SessionRecording, load_recording
+
+STEPS = ("show_question", "feedback", "show_results")
+
+class ReplayError(Exception):
+    """The replay went differently from the recording"""
+
+def synthetic_recording(count, seed=1):
+    """A recording of a player answering count stub questions, about 70% correctly"""
+    rng = random.Random(seed)
+    questions = decode_questions(build_questions(-(-count // 6)))[:count]
+    recording = SessionRecording(rng.randrange(2 ** 32), {
+        "category_id": 9, "question_type": "multiple", "question_count": count,
+        "source": None, "search": None, "review": False, "mix": [],
+    }, questions)
+    t = 0.0
+    for index, question in enumerate(questions):
+        t += rng.uniform(2, 10)
+        answer = question.correct_answer if rng.random() < 0.7 else rng.choice(question.answers)
+        recording.events.append({"kind": "answer", "t": t, "index": index, "answer": answer})
+        t += rng.uniform(0.5, 2.5)
+        recording.events.append({"kind": "next", "t": t})
+        recording.score = (recording.score or 0) + (answer == question.correct_answer)
+    return recording
+
+def replay_window_class():
+    """QuizWindow, loading from the recording and timing every step"""
+    import main as quiz_main
+
+    class ReplayWindow(quiz_main.QuizWindow):
+        feedback_timeout_ms = None  # Only the recorded "next" events advance
+
+        def __init__(self, app, recording, timings):
+            self.recording_in = recording
+            self.timings = timings
+            self.seed = recording.seed
+            settings = recording.settings
+            super().__init__(
+                app, settings.get("category_id"), settings.get("question_type", "multiple"),
+                settings.get("question_count"), settings.get("source"), settings.get("search"),
+                False, settings.get("mix") or (), settings.get("question_seconds"),
+                settings.get("quiz_seconds")
+            )
+
+        def fetch_questions(self):
+            for question in self.recording_in.questions:
+                self.load_queue.put(("question", question))
+            self.load_queue.put(("done", None))
+
+        def prefetch_next_round(self):
+            pass
+
+        # Time limits come from the recorded timeout events, not the clock
+        def start_question_countdown(self):
+            pass
+
+        def start_quiz_countdown(self):
+            pass
+
+        def timed(self, step, call, *args):
+            started = time.perf_counter()
+            call(*args)
+            self.root.update_idletasks()
+            self.timings[step].append(time.perf_counter() - started)
+
+        def show_question(self):
+            if self.engine.is_complete():
+                super().show_question()
+            else:
+                self.timed("show_question", super().show_question)
+
+        def check_answer(self, user_answer):
+            self.timed("feedback", super().check_answer, user_answer)
+
+        def show_results(self):
+            self.timed("show_results", super().show_results)
+
+    return ReplayWindow
+
+def replay(recording, timings, realtime=False):
+    """Drive one QuizWindow through the recording; returns the final score"""
+    import main as quiz_main
+
+    app = quiz_main.QuizApp()
+    window = app.show(replay_window_class(), recording, timings)
+    pump_until(app.root, lambda: not window.engine.loading)
+
+    previous = 0.0
+    for event in recording.events:
+        if realtime:
+            deadline = time.monotonic() + max(0.0, event["t"] - previous)
+            while time.monotonic() < deadline:
+                app.root.update()
+                time.sleep(0.001)
+        previous = event["t"]
+
+        if event["kind"] == "answer":
+            if window.engine.current_index != event["index"]:
+                raise ReplayError(
+                    f"expected question {event['index'] + 1}, window is on {window.engine.current_index + 1}"
+                )
+            window.check_answer(event["answer"])
+        elif event["kind"] == "timeout":
+            window.question_timed_out()
+        elif event["kind"] == "quiz_timeout":
+            window.quiz_timed_out()
+        elif event["kind"] == "next":
+            window.dismiss_feedback()
+        app.root.update()
+
+    score = window.engine.score
+    complete = window.engine.is_complete()
+    app.root.destroy()
+    if recording.score is not None and (not complete or score != recording.score):
+        raise ReplayError(f"replay scored {score}, the recording {recording.score}")
+    return score
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recording", nargs="?", help="session-*.json from main.py --record")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="replay a generated N-question session")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded pauses between events")
+    parser.add_argument("--baseline", help="JSON of p95s from --save-baseline to compare against")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="allowed p95 growth in percent")
+    parser.add_argument("--tolerance-ms", type=float, default=1.0)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    args = parser.parse_args()
+
+    if args.recording:
+        try:
+            recording = load_recording(args.recording)
+        except RecordingError as e:
+            sys.exit(f"Error: {e}")
+    else:
+        recording = synthetic_recording(args.synthetic or 20)
+
+    # Replays never touch the real bank, history or network
+    os.environ["QUIZMASTER_HOME"] = tempfile.mkdtemp(prefix="quizmaster-replay-")
+    timings = {step: [] for step in STEPS}
+    try:
+        for _ in range(args.runs):
+            score = replay(recording, timings, args.realtime)
+    except ReplayError as e:
+        sys.exit(f"FAIL: replay diverged: {e}")
+
+    print(f"{args.runs} replays of {len(recording.questions)} questions, score {score} each time")
+    p95s = {}
+    for step in STEPS:
+        stats = percentiles(timings[step])
+        p95s[step] = stats["p95"]
+        print(f"  {step:<14} {format_ms(stats)}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(p95s, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failed = False
+        for step, p95 in p95s.items():
+            allowed = baseline[step] * (1 + args.max_regression / 100) + args.tolerance_ms / 1000
+            if p95 > allowed:
+                print(f"FAIL: {step} p95 {p95 * 1000:.3f} ms > allowed {allowed * 1000:.3f} ms "
+                      f"(baseline {baseline[step] * 1000:.3f} ms)")
+                failed = True
+        if failed:
+            sys.exit(1)
+        print(f"no step regressed beyond {args.max_regression:.0f}% of the baseline p95")
+
+if __name__ == "__main__":
+    main()
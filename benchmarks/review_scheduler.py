@@ -0,0 +1,63 @@
+"""Review scheduler selection latency as the bank and review history grow.
+
+Builds a ReviewScheduler over synthetic candidates at several bank sizes,
+with a share of them already carrying review state (due, overdue or missed),
+then times one quiz turn: next_question() followed by record(). Both are
+heap operations, so the per-turn cost should stay flat while the start-up
+heapify grows linearly.
+
+    python benchmarks/review_scheduler.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+
+from harness import format_ms, percentiles
+from question_model import Question
+from review import FIRST_INTERVAL, RELEARN_INTERVAL, ReviewScheduler, ReviewState
+
+DIFFICULTIES = ["easy", "medium", "hard"]
+
+def build(size, reviewed_share, rng, now):
+    candidates = [(f"{i:064x}", rng.choice(DIFFICULTIES)) for i in range(size)]
+    states = {}
+    for digest, _ in rng.sample(candidates, int(size * reviewed_share)):
+        misses = rng.randrange(4)
+        interval = rng.choice([RELEARN_INTERVAL, FIRST_INTERVAL, FIRST_INTERVAL * 6])
+        states[digest] = ReviewState(now + rng.uniform(-2, 2) * interval, interval, misses, rng.randrange(5))
+    return candidates, states
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000])
+    parser.add_argument("--reviewed", type=float, default=0.5, help="share of the bank with review history")
+    parser.add_argument("--turns", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    now = time.time()
+    question = Question("multiple", "medium", "General Knowledge", "Q", "A", ["B", "C", "D"])
+
+    def load_question(digest):
+        # The bank lookup is a primary key read; keep it out of the timing
+        question.content_hash = digest
+        return question
+
+    for size in args.sizes:
+        candidates, states = build(size, args.reviewed, rng, now)
+        reviewed = len(states)
+        started = time.perf_counter()
+        scheduler = ReviewScheduler(candidates, states, load_question, now=now, rng=rng)
+        build_time = time.perf_counter() - started
+
+        samples = []
+        for turn in range(args.turns):
+            started = time.perf_counter()
+            picked = scheduler.next_question()
+            scheduler.record(picked, rng.random() < 0.7, now=now + turn)
+            samples.append(time.perf_counter() - started)
+        print(f"{size:>8} questions, {reviewed:>7} reviewed  "
+              f"heapify {build_time * 1000:8.1f} ms  turn {format_ms(percentiles(samples))}")
+
+if __name__ == "__main__":
+    main()
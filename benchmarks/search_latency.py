@@ -0,0 +1,81 @@
+"""Keyword search latency over a large local question bank.
+
+Fills a temporary bank with generated questions plus a sprinkling of
+realistic ones, then times QuestionBank.search_count() (run as the user
+types in the settings window) and search() (building a quiz).
+
+    python benchmarks/search_latency.py --questions 100000 --max-p95-ms 50
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from harness import format_ms, percentiles
+from opentdb import decode_questions
+from opentdb_stub import DIFFICULTIES, STUB_CATEGORIES, TYPES, build_questions
+from question_bank import QuestionBank
+from question_model import Question
+
+QUERIES = ["roman", "roman emperor", "stub question", "answer 9", "wrong", "caesar", "more", "zzz"]
+
+EXTRA = [
+    ("Which Roman emperor built a wall across northern Britain?", "Hadrian", ["Nero", "Caligula", "Trajan"]),
+    ("In which year was Julius Caesar assassinated?", "44 BC", ["31 BC", "27 BC", "63 BC"]),
+    ("What was the Roman name for London?", "Londinium", ["Eboracum", "Deva", "Aquae Sulis"]),
+]
+
+def fill_bank(bank, count, rng):
+    combinations = len(STUB_CATEGORIES) * len(TYPES) * len(DIFFICULTIES)
+    raw = build_questions(-(-count // combinations))[:count]
+    by_category = {}
+    for q, question in zip(raw, decode_questions(raw)):
+        by_category.setdefault(q["category_id"], []).append(question)
+    for i in range(count // 100):
+        text, correct, incorrect = rng.choice(EXTRA)
+        by_category[23].append(Question("multiple", "medium", "History", f"{text} ({i})", correct, incorrect))
+    for category_id, questions in by_category.items():
+        bank.add_questions(category_id, questions)
+
+def time_calls(call, runs):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=20, help="timed runs per query")
+    parser.add_argument("--max-p95-ms", type=float, help="exit non-zero if any query's p95 exceeds this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="quizmaster-search-") as directory:
+        bank = QuestionBank(os.path.join(directory, "questions.db"))
+        started = time.perf_counter()
+        fill_bank(bank, args.questions, random.Random(1))
+        print(f"indexed {bank.total()} questions in {time.perf_counter() - started:.1f} s "
+              f"({'FTS5' if bank.has_fts else 'LIKE scan, no FTS5'})")
+
+        worst = 0.0
+        for query in QUERIES:
+            # Filtered by type, as the settings window always is
+            counts = percentiles(time_calls(lambda: bank.search_count(query, "multiple"), args.runs))
+            quizzes = percentiles(time_calls(lambda: bank.search(query, "multiple", 20), args.runs))
+            worst = max(worst, counts["p95"], quizzes["p95"])
+            print(f"{query!r}: {bank.search_count(query, 'multiple')} multiple choice matches")
+            print(f"  count      {format_ms(counts)}")
+            print(f"  quiz of 20 {format_ms(quizzes)}")
+        bank.close()
+
+    print(f"worst p95: {worst * 1000:.1f} ms")
+    if args.max_p95_ms is not None and worst * 1000 > args.max_p95_ms:
+        print(f"FAIL: p95 above {args.max_p95_ms} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
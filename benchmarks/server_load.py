@@ -0,0 +1,98 @@
+"""LAN quiz server under a classroom's worth of simulated players (and then some).
+
+Starts a QuizServer against the local OpenTDB stub and connects hundreds of
+players to it from the same process, each answering every question after a
+random think time. Reports the time to be seated, the broadcast fan-out
+(question sent to question received by each player) and the answer round
+trip (answer sent to ack received), as percentiles.
+
+    python benchmarks/server_load.py --players 500 --questions 10 --max-p95-ms 100
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from harness import format_ms, percentiles, stub_environment
+from quiz_server import BACKLOG, MAX_LINE, QuizServer, encode, load_quiz
+
+async def simulate_player(name, port, server, think_max, rng, timings):
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(encode({"type": "join", "name": name}))
+    answered_at = None
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "welcome":
+                timings["join"].append(loop.time() - started)
+            elif kind == "question":
+                # Same process, same clock: the server stamped when it sent the question
+                timings["fanout"].append(loop.time() - server.asked_at)
+                await asyncio.sleep(rng.uniform(0, think_max))
+                answered_at = loop.time()
+                writer.write(encode({
+                    "type": "answer", "index": message["index"], "answer": rng.choice(message["choices"])
+                }))
+            elif kind == "ack":
+                timings["answer"].append(loop.time() - answered_at)
+            elif kind == "final":
+                return
+    finally:
+        writer.close()
+
+async def run(args):
+    engine, error = await load_quiz(9, "multiple", args.questions)
+    if engine is None:
+        raise SystemExit(f"{error[0]}: {error[1]}")
+    server = QuizServer(engine, question_seconds=args.think_max + 5, reveal_seconds=0)
+    listener = await asyncio.start_server(
+        server.handle_client, "127.0.0.1", 0, limit=MAX_LINE, backlog=BACKLOG
+    )
+    port = listener.sockets[0].getsockname()[1]
+
+    timings = {"join": [], "fanout": [], "answer": []}
+    rng = random.Random(5)
+    async with listener:
+        players = [
+            asyncio.create_task(simulate_player(f"player{i}", port, server, args.think_max, rng, timings))
+            for i in range(args.players)
+        ]
+        await server.wait_for_players(args.players, 30)
+        started = time.perf_counter()
+        await server.play()
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*players)
+        server.close()
+
+    print(f"{args.players} players, {len(engine.questions)} questions in {elapsed:.1f} s")
+    for name, label in (("join", "seated"), ("fanout", "question fan-out"), ("answer", "answer round trip")):
+        print(f"  {label:<18} {format_ms(percentiles(timings[name]))}")
+    answers = sum(player.answered for player in server.players.values())
+    print(f"  {answers} answers scored; leader {server.standings()[0].name} "
+          f"with {server.standings()[0].score}")
+    return max(percentiles(timings["fanout"])["p95"], percentiles(timings["answer"])["p95"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=300)
+    parser.add_argument("--questions", type=int, default=10)
+    parser.add_argument("--think-max", type=float, default=1.0, help="longest simulated think time (s)")
+    parser.add_argument("--max-p95-ms", type=float, help="exit non-zero if fan-out or answer p95 exceeds this")
+    args = parser.parse_args()
+
+    with stub_environment(per_combination=args.questions):
+        worst = asyncio.run(run(args))
+    if args.max_p95_ms is not None and worst * 1000 > args.max_p95_ms:
+        print(f"FAIL: p95 above {args.max_p95_ms} ms")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Soak benchmark: play many back-to-back rounds in one process and track memory.
+
+Every round goes settings -> quiz -> results -> "New Quiz" through the real
+screens, with questions served by the local OpenTDB stub. RSS, the number
+of Tcl commands and the number of live Python objects are sampled
+periodically; all three should stay flat.
+
+    python benchmarks/soak_rounds.py --rounds 1000
+
+Needs a display (use xvfb-run on headless machines).
+"""
+import argparse
+import gc
+import sys
+import time
+
+from harness import pump_until, stub_environment
+
+def rss_mb():
+    """Resident set size of this process in MiB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+def play_round(app, question_count):
+    settings = app.show_settings(9, "multiple", question_count)
+    settings.start_quiz()
+    quiz = app.screen
+    pump_until(app.root, lambda: not quiz.engine.loading)
+
+    while not quiz.engine.is_complete():
+        correct_answer = quiz.engine.current_question().correct_answer
+        quiz.check_answer(correct_answer)
+        app.root.update_idletasks()
+        quiz.dismiss_feedback()
+        app.root.update()
+
+    quiz.restart_quiz()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=2, help="questions per round")
+    parser.add_argument("--sample-every", type=int, default=100)
+    parser.add_argument("--max-growth-mb", type=float, default=5.0,
+                        help="fail if RSS grows more than this after warm-up")
+    args = parser.parse_args()
+
+    with stub_environment() as stub:
+        import main as quiz_main
+
+        app = quiz_main.QuizApp()
+        app.show_settings()
+        app.root.update()
+
+        baseline = None
+        started = time.perf_counter()
+        print(f"{'round':>7} {'rss MiB':>9} {'tcl cmds':>9} {'objects':>9} {'rounds/s':>9}")
+        for round_number in range(1, args.rounds + 1):
+            play_round(app, args.questions)
+            if round_number % args.sample_every == 0 or round_number == 1:
+                # The stub runs in this process; its request log is not the app's memory
+                with stub.state.lock:
+                    stub.state.request_log.clear()
+                gc.collect()
+                app.root.update()
+                rss = rss_mb()
+                commands = len(app.root.tk.splitlist(app.root.tk.call("info", "commands")))
+                objects = len(gc.get_objects())
+                rate = round_number / (time.perf_counter() - started)
+                print(f"{round_number:>7} {rss:>9.1f} {commands:>9} {objects:>9} {rate:>9.1f}")
+                # The first sample includes one-off warm-up allocations
+                if baseline is None and round_number >= args.sample_every:
+                    baseline = rss
+
+        app.root.destroy()
+
+    growth = rss - (baseline if baseline is not None else rss)
+    print(f"RSS growth after warm-up: {growth:+.1f} MiB")
+    if growth > args.max_growth_mb:
+        print(f"FAIL: RSS grew more than {args.max_growth_mb} MiB")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Cold-start benchmark: import cost and wall-clock time to the first frame.
+
+Runs fresh interpreters so every number is a true cold start:
+
+* ``python -X importtime -c "import main"`` broken down by module, plus a
+  check that the HTTP stack (requests/urllib3) is not imported at startup;
+* time from process launch until the settings window is visible.
+
+    python benchmarks/startup.py --runs 10
+    python benchmarks/startup.py --json startup.json   # for per-release tracking
+
+The first-frame measurement needs a display (use xvfb-run on headless machines).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from harness import REPO_ROOT
+
+HTTP_MODULES = ("requests", "urllib3", "charset_normalizer", "idna", "certifi")
+
+# Executed in the child: build the settings screen and report when it is visible
+FIRST_FRAME_SCRIPT = """
+import sys, time
+preloaded = set(sys.modules)
+import main
+app = main.QuizApp()
+app.show_settings()
+app.root.wait_visibility()
+app.root.update_idletasks()
+print(time.monotonic())
+print(",".join(name for name in {modules!r} if name in sys.modules and name not in preloaded))
+app.root.destroy()
+"""
+
+def child_env():
+    env = dict(os.environ)
+    # An empty data directory is the worst case: no cached categories
+    env["QUIZMASTER_HOME"] = tempfile.mkdtemp(prefix="quizmaster-startup-")
+    env["PYTHONPATH"] = REPO_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+def import_breakdown(top):
+    """Parse -X importtime output into (self_us, cumulative_us, module) rows"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=REPO_ROOT, env=child_env(), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+
+    # Children are printed before their parent and indented deeper, so the
+    # "import main" subtree is the run of indented rows just above it. This
+    # skips anything the interpreter imported at startup (site, .pth files).
+    main_index = next(i for i, row in enumerate(rows) if row[2].strip() == "main")
+    start = main_index
+    while start > 0 and rows[start - 1][2].startswith("  "):
+        start -= 1
+    subtree = rows[start:main_index + 1]
+
+    heavy = sorted(subtree, key=lambda row: row[0], reverse=True)[:top]
+    loaded = [name.strip().split(".")[0] for _, _, name in subtree]
+    return rows[main_index][1], heavy, [name for name in HTTP_MODULES if name in loaded]
+
+def first_frame_time():
+    """Seconds from launching the interpreter to the settings window being visible"""
+    script = FIRST_FRAME_SCRIPT.format(modules=HTTP_MODULES)
+    started = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=REPO_ROOT, env=child_env(), capture_output=True, text=True, check=True
+    )
+    painted_at, http_modules = result.stdout.splitlines()[:2]
+    return float(painted_at) - started, [name for name in http_modules.split(",") if name]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules to list")
+    parser.add_argument("--no-frame", action="store_true", help="skip the first-frame measurement")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(args.runs):
+        total_us, heavy, http_at_import = import_breakdown(args.top)
+        totals.append(total_us)
+
+    print(f"import main: median {statistics.median(totals) / 1000:.1f} ms over {args.runs} runs")
+    print(f"{'self ms':>9} {'cumul ms':>9}  module (last run)")
+    for self_us, cumulative_us, name in heavy:
+        print(f"{self_us / 1000:>9.2f} {cumulative_us / 1000:>9.2f}  {name}")
+    print("HTTP stack imported by 'import main':", ", ".join(http_at_import) or "no")
+
+    results = {
+        "import_main_ms": statistics.median(totals) / 1000,
+        "http_modules_at_import": http_at_import,
+    }
+
+    if not args.no_frame:
+        frames = []
+        for _ in range(args.runs):
+            seconds, http_at_frame = first_frame_time()
+            frames.append(seconds)
+        print(f"launch to first frame: median {statistics.median(frames) * 1000:.1f} ms, "
+              f"max {max(frames) * 1000:.1f} ms")
+        print("HTTP stack imported before first frame:", ", ".join(http_at_frame) or "no")
+        results["first_frame_ms"] = statistics.median(frames) * 1000
+        results["http_modules_at_first_frame"] = http_at_frame
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
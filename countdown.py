@@ -0,0 +1,69 @@
+import math
+import time
+
+class Countdown:
+    """A countdown to a fixed deadline on the monotonic clock, driven by Tk timers.
+
+    Tk's after() only promises not to fire early; each callback can land
+    late, and a chain of one-second timers drifts by the sum of those
+    delays. Here the deadline is fixed when the countdown starts and every
+    tick recomputes the time left from it, then sleeps only until the
+    displayed whole second next changes. A late tick (a busy event loop, or
+    a modal holding the grab) therefore shows the correct time as soon as
+    it runs, and expiry fires within a timer slice of the true deadline.
+
+    schedule(ms, callback) and cancel(timer_id) are Screen.after and
+    root.after_cancel; on_tick(seconds_left) redraws the display and
+    on_expire() runs once when time is up.
+    """
+
+    def __init__(self, schedule, cancel, seconds, on_tick, on_expire, clock=time.monotonic):
+        self.schedule = schedule
+        self.cancel = cancel
+        self.seconds = seconds
+        self.on_tick = on_tick
+        self.on_expire = on_expire
+        self.clock = clock
+        self.deadline = None
+        self.timer = None
+
+    def start(self):
+        self.deadline = self.clock() + self.seconds
+        self.tick()
+        return self
+
+    def stop(self):
+        if self.timer is not None:
+            self.cancel(self.timer)
+            self.timer = None
+        self.deadline = None
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def remaining(self):
+        """Seconds left, never below zero (0.0 once stopped)"""
+        if self.deadline is None:
+            return 0.0
+        return max(0.0, self.deadline - self.clock())
+
+    def tick(self):
+        self.timer = None
+        if self.deadline is None:
+            return
+        left = self.deadline - self.clock()
+        if left <= 0:
+            self.deadline = None
+            self.on_tick(0)
+            self.on_expire()
+            return
+        self.on_tick(math.ceil(left))
+        # Wake when the displayed second changes (or at the deadline itself)
+        until_next = left - (math.ceil(left) - 1)
+        self.timer = self.schedule(max(1, math.ceil(until_next * 1000)), self.tick)
+
+def format_clock(seconds):
+    """Whole seconds as m:ss"""
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
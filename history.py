@@ -0,0 +1,237 @@
+import collections
+import getpass
+import os
+import sqlite3
+import threading
+import time
+
+from review import NEW_STATE, ReviewState, next_state
+from storage import data_dir
+
+HISTORY_FILE = "history.db"
+TREND_DAYS = 7
+ALL_PLAYERS = "*"  # Player key under which every player's answers are also totalled
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    source TEXT,
+    category_id INTEGER,
+    question_type TEXT,
+    score INTEGER,
+    total INTEGER
+);
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    question_hash TEXT,
+    category TEXT,
+    difficulty TEXT,
+    type TEXT,
+    correct INTEGER NOT NULL,
+    response_ms INTEGER,
+    answered_at REAL NOT NULL
+);
+-- Running totals, updated in the same transaction as each logged answer so
+-- reading statistics never scans the log
+CREATE TABLE IF NOT EXISTS stats (
+    player TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    answers INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    response_ms INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (player, dimension, value)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS reviews (
+    player TEXT NOT NULL,
+    question_hash TEXT NOT NULL,
+    due_at REAL NOT NULL,
+    interval REAL NOT NULL,
+    misses INTEGER NOT NULL,
+    streak INTEGER NOT NULL,
+    PRIMARY KEY (player, question_hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily (
+    player TEXT NOT NULL,
+    day TEXT NOT NULL,
+    answers INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    response_ms INTEGER NOT NULL DEFAULT 0,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (player, day)
+) WITHOUT ROWID;
+"""
+
+STATS_UPSERT = (
+    "INSERT INTO stats (player, dimension, value, answers, correct, response_ms) "
+    "VALUES (?, ?, ?, 1, ?, ?) "
+    "ON CONFLICT (player, dimension, value) DO UPDATE SET "
+    "answers = answers + 1, correct = correct + excluded.correct, "
+    "response_ms = response_ms + excluded.response_ms"
+)
+DAILY_UPSERT = (
+    "INSERT INTO daily (player, day, answers, correct, response_ms, sessions) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (player, day) DO UPDATE SET "
+    "answers = answers + excluded.answers, correct = correct + excluded.correct, "
+    "response_ms = response_ms + excluded.response_ms, sessions = sessions + excluded.sessions"
+)
+
+class Aggregate(collections.namedtuple("Aggregate", "answers correct response_ms")):
+    """Answer totals for some slice of the history"""
+    __slots__ = ()
+
+    @property
+    def accuracy(self):
+        """Percentage of correct answers (0.0 with no answers)"""
+        return self.correct / self.answers * 100 if self.answers else 0.0
+
+    @property
+    def mean_response(self):
+        """Average seconds taken to answer"""
+        return self.response_ms / self.answers / 1000 if self.answers else 0.0
+
+EMPTY = Aggregate(0, 0, 0)
+
+def current_player():
+    """Player name for the history: $QUIZMASTER_PLAYER, else the OS login"""
+    name = os.environ.get("QUIZMASTER_PLAYER")
+    if name:
+        return name
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return "player"
+
+def day_of(timestamp):
+    return time.strftime("%Y-%m-%d", time.localtime(timestamp))
+
+# ------------------- Attempt History ------------------- #
+class AttemptHistory:
+    """Durable log of every quiz session and answer, with running statistics"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(data_dir(), HISTORY_FILE)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            # Durable across app crashes; only a power cut can lose the last commits
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def start_session(self, player, source, category_id, question_type):
+        """Log the start of a quiz and return its session id"""
+        now = time.time()
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO sessions (player, started_at, source, category_id, question_type) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (player, now, source, category_id, question_type)
+            )
+            for key in (player, ALL_PLAYERS):
+                self.conn.execute(DAILY_UPSERT, (key, day_of(now), 0, 0, 0, 1))
+        return cursor.lastrowid
+
+    def record_answer(self, session_id, player, question, correct, response_seconds):
+        """Append one answer and fold it into the running totals"""
+        with self.lock, self.conn:
+            self.apply_answer(session_id, player, question, correct, response_seconds, time.time())
+
+    def apply_answer(self, session_id, player, question, correct, response_seconds, answered_at):
+        """Write an answer inside the caller's transaction"""
+        correct = int(bool(correct))
+        response_ms = int(round(response_seconds * 1000))
+        self.conn.execute(
+            "INSERT INTO answers (session_id, player, question_hash, category, difficulty, "
+            "type, correct, response_ms, answered_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (session_id, player, question.content_hash, question.category, question.difficulty,
+             question.type, correct, response_ms, answered_at)
+        )
+
+        day = day_of(answered_at)
+        slices = (("all", ""), ("category", question.category or ""),
+                  ("difficulty", question.difficulty or ""))
+        for key in (player, ALL_PLAYERS):
+            self.conn.executemany(
+                STATS_UPSERT,
+                [(key, dimension, value, correct, response_ms) for dimension, value in slices]
+            )
+            self.conn.execute(DAILY_UPSERT, (key, day, 1, correct, response_ms, 0))
+        if question.content_hash is not None:
+            self.update_review(player, question, correct, answered_at)
+
+    def update_review(self, player, question, correct, answered_at):
+        """Reschedule the question for review mode, whatever kind of quiz it was answered in"""
+        row = self.conn.execute(
+            "SELECT due_at, interval, misses, streak FROM reviews WHERE player = ? AND question_hash = ?",
+            (player, question.content_hash)
+        ).fetchone()
+        state = next_state(ReviewState(*row) if row else NEW_STATE, question.difficulty, correct, answered_at)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO reviews (player, question_hash, due_at, interval, misses, streak) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (player, question.content_hash, state.due_at, state.interval, state.misses, state.streak)
+        )
+
+    def finish_session(self, session_id, score, total):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE sessions SET finished_at = ?, score = ?, total = ? WHERE id = ?",
+                (time.time(), score, total, session_id)
+            )
+
+    def totals(self, player, dimension="all", value=""):
+        """Running totals for one slice, e.g. totals(player, "category", "History")"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT answers, correct, response_ms FROM stats "
+                "WHERE player = ? AND dimension = ? AND value = ?",
+                (player, dimension, value)
+            ).fetchone()
+        return Aggregate(*row) if row else EMPTY
+
+    def breakdown(self, player, dimension):
+        """{value: Aggregate} for every category or difficulty the player has answered"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT value, answers, correct, response_ms FROM stats "
+                "WHERE player = ? AND dimension = ?",
+                (player, dimension)
+            ).fetchall()
+        return {value: Aggregate(*totals) for value, *totals in rows}
+
+    def recent(self, player, days=TREND_DAYS):
+        """Totals over the last days days, read from at most days daily rows"""
+        since = day_of(time.time() - (days - 1) * 86400)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(answers), 0), COALESCE(SUM(correct), 0), "
+                "COALESCE(SUM(response_ms), 0) FROM daily WHERE player = ? AND day >= ?",
+                (player, since)
+            ).fetchone()
+        return Aggregate(*row)
+
+    def review_states(self, player):
+        """{question_hash: ReviewState} for every question the player has answered"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT question_hash, due_at, interval, misses, streak FROM reviews WHERE player = ?",
+                (player,)
+            ).fetchall()
+        return {digest: ReviewState(*state) for digest, *state in rows}
+
+def open_history():
+    """Open the attempt history, or return None if it is unavailable"""
+    try:
+        return AttemptHistory()
+    except (sqlite3.Error, OSError):
+        return None
@@ -1,8 +1,25 @@
-import requests
-import html
+import queue
+import random
+import threading
+import argparse
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox
-import random
+
+import metrics
+from countdown import Countdown, format_clock
+from history import TREND_DAYS, current_player, open_history
+from opentdb import RequestError, client
+from prefetch import prefetcher
+from question_counts import load_question_counts, refresh_question_counts
+from question_pack import PackError, QuestionPack, find_packs
+from question_bank import open_bank
+from quiz_engine import (
+    QuizEngine, load_mixed_questions, load_pack_questions, load_questions, load_search_questions
+)
+from review import open_review_scheduler
+from session_record import SessionRecording
+from storage import read_json_cache, write_json_cache
 
 # ------------------- Modern Color Scheme ------------------- #
 COLORS = {
@@ -21,9 +38,38 @@ COLORS = {
     'card_shadow': '#e2e8f0'   # Card shadow
 }
 
+# Icons and colors for each dialog type, shared by modals and the feedback banner
+MODAL_ICONS = {
+    "info": "ℹ️",
+    "success": "✅",
+    "warning": "⚠️",
+    "error": "❌",
+    "question": "❓"
+}
+
+MODAL_COLORS = {
+    "info": COLORS['primary'],
+    "success": COLORS['accent'],
+    "warning": COLORS['warning'],
+    "error": COLORS['danger'],
+    "question": COLORS['primary']
+}
+
+MODAL_HOVER_COLORS = {
+    "info": COLORS['primary_hover'],
+    "success": '#0da271',
+    "warning": '#e69008',
+    "error": '#dc2626',
+    "question": COLORS['primary_hover']
+}
+
 # ------------------- Beautiful Modal Dialog ------------------- #
 class BeautifulModal:
     def __init__(self, parent, title, message, modal_type="info", details=None):
+        with metrics.span("modal_create", modal_type=modal_type):
+            self.build(parent, title, message, modal_type, details)
+        
+    def build(self, parent, title, message, modal_type, details):
         self.parent = parent
         self.title = title
         self.message = message
@@ -43,14 +89,7 @@ class BeautifulModal:
         self.center_modal()
         
         # Set modal icon based on type
-        icons = {
-            "info": "ℹ️",
-            "success": "✅",
-            "warning": "⚠️",
-            "error": "❌",
-            "question": "❓"
-        }
-        self.icon = icons.get(modal_type, "ℹ️")
+        self.icon = MODAL_ICONS.get(modal_type, "ℹ️")
         
         self.create_widgets()
         
@@ -118,92 +157,232 @@ class BeautifulModal:
         ok_button.pack()
         
     def get_icon_color(self):
-        colors = {
-            "info": COLORS['primary'],
-            "success": COLORS['accent'],
-            "warning": COLORS['warning'],
-            "error": COLORS['danger'],
-            "question": COLORS['primary']
-        }
-        return colors.get(self.modal_type, COLORS['primary'])
+        return MODAL_COLORS.get(self.modal_type, COLORS['primary'])
         
     def get_button_color(self):
-        colors = {
-            "info": COLORS['primary'],
-            "success": COLORS['accent'],
-            "warning": COLORS['warning'],
-            "error": COLORS['danger'],
-            "question": COLORS['primary']
-        }
-        return colors.get(self.modal_type, COLORS['primary'])
+        return MODAL_COLORS.get(self.modal_type, COLORS['primary'])
         
     def get_button_hover_color(self):
-        colors = {
-            "info": COLORS['primary_hover'],
-            "success": '#0da271',
-            "warning": '#e69008',
-            "error": '#dc2626',
-            "question": COLORS['primary_hover']
-        }
-        return colors.get(self.modal_type, COLORS['primary_hover'])
+        return MODAL_HOVER_COLORS.get(self.modal_type, COLORS['primary_hover'])
+
+# ------------------- Inline Answer Feedback ------------------- #
+class FeedbackBanner:
+    """Answer feedback shown inside a frame, built once and reconfigured per answer"""
+    
+    def __init__(self, parent):
+        self.frame = tk.Frame(parent, bg=COLORS['card_bg'], relief=tk.RAISED, bd=1)
+        self.on_dismiss = None
+        
+        self.icon_label = tk.Label(self.frame, font=("Arial", 20), bg=COLORS['card_bg'])
+        self.icon_label.pack(side=tk.LEFT, padx=(15, 10), pady=10)
+        
+        text_frame = tk.Frame(self.frame, bg=COLORS['card_bg'])
+        text_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, pady=10)
+        
+        self.title_label = tk.Label(
+            text_frame, font=("Arial", 13, "bold"), bg=COLORS['card_bg'], fg=COLORS['text']
+        )
+        self.title_label.pack(anchor=tk.W)
+        
+        self.message_label = tk.Label(
+            text_frame, font=("Arial", 11), bg=COLORS['card_bg'], fg=COLORS['text'],
+            wraplength=340, justify=tk.LEFT
+        )
+        self.message_label.pack(anchor=tk.W)
+        
+        self.next_button = tk.Button(
+            self.frame, text="Next ➜", command=self.dismiss,
+            font=("Arial", 11, "bold"), fg=COLORS['light'],
+            relief='flat', padx=15, pady=5, cursor='hand2'
+        )
+        self.next_button.pack(side=tk.RIGHT, padx=15, pady=10)
+        
+    def show(self, title, message, modal_type, on_dismiss):
+        """Reconfigure the banner for an answer and make it visible"""
+        self.on_dismiss = on_dismiss
+        self.icon_label.config(text=MODAL_ICONS.get(modal_type, "ℹ️"), fg=MODAL_COLORS.get(modal_type, COLORS['primary']))
+        self.title_label.config(text=title)
+        self.message_label.config(text=message)
+        self.next_button.config(
+            bg=MODAL_COLORS.get(modal_type, COLORS['primary']),
+            activebackground=MODAL_HOVER_COLORS.get(modal_type, COLORS['primary_hover'])
+        )
+        self.frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=10)
+        
+    def dismiss(self):
+        """Hide the banner and notify whoever showed it"""
+        self.frame.pack_forget()
+        callback, self.on_dismiss = self.on_dismiss, None
+        if callback:
+            callback()
 
 # ------------------- Fetch categories ------------------- #
+CATEGORY_CACHE_FILE = "categories.json"
+CATEGORY_CACHE_TTL = 24 * 60 * 60  # Refresh the cached category list once a day
+
+# Used only when there is neither a cached list nor a network connection
+FALLBACK_CATEGORIES = {
+    "General Knowledge": 9,
+    "Entertainment: Books": 10,
+    "Entertainment: Film": 11,
+    "Entertainment: Music": 12,
+    "Science & Nature": 17,
+    "Computers": 18,
+    "Mathematics": 19,
+    "Mythology": 20,
+    "Sports": 21,
+    "Geography": 22,
+    "History": 23,
+    "Animals": 27,
+    "Vehicles": 28
+}
+
 def fetch_categories():
+    """Download the category list from the API (raises opentdb.RequestError)"""
+    return client.categories()
+
+def load_categories():
+    """Return (category_map, needs_refresh) without touching the network"""
+    cached, is_fresh = read_json_cache(CATEGORY_CACHE_FILE, CATEGORY_CACHE_TTL)
+    if cached:
+        metrics.incr("cache_hits", cache="categories")
+        return cached, not is_fresh
+    metrics.incr("cache_misses", cache="categories")
+    return dict(FALLBACK_CATEGORIES), True
+
+def refresh_categories():
+    """Fetch categories and update the on-disk cache, or return None on failure"""
     try:
-        CATEGORY_URL = "https://opentdb.com/api_category.php"
-        response = requests.get(CATEGORY_URL, timeout=10)
-        response.raise_for_status()
-        categories_data = response.json()["trivia_categories"]
-        return {cat["name"]: cat["id"] for cat in categories_data}
-    except requests.RequestException:
-        # Use BeautifulModal instead of messagebox
-        return {
-            "General Knowledge": 9,
-            "Entertainment: Books": 10,
-            "Entertainment: Film": 11,
-            "Entertainment: Music": 12,
-            "Science & Nature": 17,
-            "Computers": 18,
-            "Mathematics": 19,
-            "Mythology": 20,
-            "Sports": 21,
-            "Geography": 22,
-            "History": 23,
-            "Animals": 27,
-            "Vehicles": 28
-        }
+        with metrics.span("category_fetch"):
+            categories = fetch_categories()
+    except RequestError:
+        return None
+    write_json_cache(CATEGORY_CACHE_FILE, categories)
+    return categories
+
+# ------------------- Screens ------------------- #
+class Screen:
+    """A page of the app, built in a frame inside the single root window"""
+    title = "QuizMaster"
+    width = 500
+    height = 600
+    
+    def __init__(self, app):
+        self.app = app
+        self.root = app.root
+        self.active = True
+        
+        self.app.configure_window(self.title, self.width, self.height)
+        self.frame = tk.Frame(self.root, bg=COLORS['background'])
+        self.frame.pack(fill=tk.BOTH, expand=True)
+        
+    def after(self, ms, callback):
+        """Schedule a callback that is skipped once the screen has been replaced"""
+        def run():
+            if self.active:
+                callback()
+        return self.root.after(ms, run)
+        
+    def destroy(self):
+        """Tear down the screen's widgets so the next screen can take its place"""
+        self.active = False
+        self.frame.destroy()
 
 # ------------------- Quiz Settings Window ------------------- #
-class QuizSettingsWindow:
-    def __init__(self):
-        self.root = tk.Tk()
-        self.root.title("Quiz Settings")
-        self.root.config(bg=COLORS['background'])
-        self.root.geometry("500x600")
-        self.root.resizable(False, False)
-        
-        # Center the window on screen
-        self.center_window()
+STARTUP_DEFER_MS = 50  # Delay before background work so the window paints first
+ALL_QUESTIONS = "all"  # Count option that plays every question in the category
+API_SOURCE = "Open Trivia DB (online)"
+SEARCH_DELAY_MS = 150  # Wait for a pause in typing before counting matches
+SEARCH_COUNT_CAP = 1000  # Stop counting matches beyond this ("1000+")
+
+# Time limit choices: label -> seconds (None for no limit)
+QUESTION_TIME_LIMITS = {"Off": None, "10 seconds": 10, "20 seconds": 20, "30 seconds": 30, "1 minute": 60}
+QUIZ_TIME_LIMITS = {"Off": None, "1 minute": 60, "2 minutes": 120, "5 minutes": 300, "10 minutes": 600}
+
+def time_limit_label(limits, seconds):
+    for label, value in limits.items():
+        if value == seconds:
+            return label
+    return "Off"
+
+def parse_question_count(value):
+    """Map a count option to a number of questions, or None for the whole category"""
+    return None if value == ALL_QUESTIONS else int(value)
+
+class QuizSettingsWindow(Screen):
+    title = "Quiz Settings"
+    width = 500
+    height = 600
+    
+    def __init__(self, app, category_id=None, question_type="multiple", question_count=10,
+                 source=None, search=None, review=False, mix=(), question_seconds=None,
+                 quiz_seconds=None):
+        super().__init__(app)
         
         # Variables to store user selections
-        self.category_var = tk.StringVar()
-        self.type_var = tk.StringVar(value="multiple")
-        self.count_var = tk.StringVar(value="10")
+        self.source_var = tk.StringVar(self.frame, value=API_SOURCE)
+        self.review_var = tk.BooleanVar(self.frame, value=review)
+        self.question_limit_var = tk.StringVar(
+            self.frame, value=time_limit_label(QUESTION_TIME_LIMITS, question_seconds)
+        )
+        self.quiz_limit_var = tk.StringVar(
+            self.frame, value=time_limit_label(QUIZ_TIME_LIMITS, quiz_seconds)
+        )
+        self.search_var = tk.StringVar(self.frame, value=search or "")
+        self.search_bank = None
+        self.search_timer = None
+        self.category_var = tk.StringVar(self.frame)
+        self.type_var = tk.StringVar(self.frame, value=question_type)
+        self.count_var = tk.StringVar(
+            self.frame, value=ALL_QUESTIONS if question_count is None else str(question_count)
+        )
         
-        self.category_map = fetch_categories()
+        # Serve categories from the local cache and revalidate in the background
+        self.api_categories, needs_refresh = load_categories()
+        self.api_count_index, counts_need_refresh = load_question_counts()
+        self.category_map = self.api_categories
+        self.count_index = self.api_count_index
+        
+        # Offline packs in the data directory can stand in for the API
+        self.packs = find_packs()
+        self.pack = None
         self.create_widgets()
         
-    def center_window(self):
-        """Center the window on the screen"""
-        self.root.update_idletasks()
-        x = (self.root.winfo_screenwidth() // 2) - (500 // 2)
-        y = (self.root.winfo_screenheight() // 2) - (600 // 2)
-        self.root.geometry(f"500x600+{x}+{y}")
+        # Preselect the previous round's source and category when coming back from a quiz
+        for name, path in self.packs.items():
+            if path == source:
+                self.source_var.set(name)
+                self.apply_source()
+        for name, cid in self.category_map.items():
+            if cid == category_id:
+                self.category_combo.set(name)
+        self.select_mix(mix)
+        self.update_count_options()
+                
+        # A pending prefetch is only useful if the settings stay the same
+        self.traces = [
+            (var, var.trace_add("write", lambda *args: self.settings_changed()))
+            for var in (self.category_var, self.type_var, self.count_var)
+        ]
+        self.traces.append(
+            (self.source_var, self.source_var.trace_add("write", lambda *args: self.apply_source()))
+        )
+        for var in (self.search_var, self.type_var):
+            self.traces.append((var, var.trace_add("write", lambda *args: self.schedule_search_count())))
+        if search:
+            self.schedule_search_count()
+        
+        # Start the refresh only after the first frame has been painted, so
+        # importing the HTTP stack never competes with startup
+        if needs_refresh:
+            self.after(STARTUP_DEFER_MS, self.start_category_refresh)
+        if counts_need_refresh:
+            self.after(STARTUP_DEFER_MS, self.start_count_refresh)
         
     def create_widgets(self):
         # Create a canvas and scrollbar for the settings window
-        canvas = tk.Canvas(self.root, bg=COLORS['background'], highlightthickness=0)
-        scrollbar = ttk.Scrollbar(self.root, orient="vertical", command=canvas.yview)
+        canvas = tk.Canvas(self.frame, bg=COLORS['background'], highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=canvas.yview)
         scrollable_frame = tk.Frame(canvas, bg=COLORS['background'])
         
         scrollable_frame.bind(
@@ -241,6 +420,21 @@ class QuizSettingsWindow:
         content_frame = tk.Frame(inner_frame, bg=COLORS['card_bg'], padx=30, pady=20)
         content_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Question source selection, only when offline packs are installed
+        if self.packs:
+            source_frame = tk.Frame(content_frame, bg=COLORS['card_bg'])
+            source_frame.pack(fill=tk.X, pady=10)
+            
+            tk.Label(
+                source_frame, text="Question Source:", 
+                font=("Arial", 12, "bold"), bg=COLORS['card_bg'], fg=COLORS['text']
+            ).pack(anchor=tk.W, pady=(0, 5))
+            
+            ttk.Combobox(
+                source_frame, values=[API_SOURCE] + list(self.packs),
+                width=40, state="readonly", font=("Arial", 10), textvariable=self.source_var
+            ).pack(fill=tk.X, pady=5)
+        
         # Category selection
         category_frame = tk.Frame(content_frame, bg=COLORS['card_bg'])
         category_frame.pack(fill=tk.X, pady=10)
@@ -259,6 +453,21 @@ class QuizSettingsWindow:
         self.category_combo.pack(fill=tk.X, pady=5)
         self.category_combo.set("Entertainment: Film")  # Default selection
         
+        # Extra categories for one interleaved quiz, loaded side by side
+        tk.Label(
+            category_frame, text="Mix in other categories (optional):",
+            font=("Arial", 10), bg=COLORS['card_bg'], fg=COLORS['muted']
+        ).pack(anchor=tk.W, pady=(5, 0))
+        
+        self.mix_names = sorted_categories
+        self.mix_list = tk.Listbox(
+            category_frame, selectmode=tk.MULTIPLE, exportselection=False, height=5,
+            font=("Arial", 10), relief='solid', bd=1
+        )
+        self.mix_list.insert(tk.END, *self.mix_names)
+        self.mix_list.pack(fill=tk.X, pady=5)
+        self.mix_list.bind("<<ListboxSelect>>", lambda event: self.settings_changed())
+        
         # Question type selection
         type_frame = tk.Frame(content_frame, bg=COLORS['card_bg'])
         type_frame.pack(fill=tk.X, pady=10)
@@ -296,12 +505,17 @@ class QuizSettingsWindow:
         count_options_frame = tk.Frame(count_frame, bg=COLORS['card_bg'])
         count_options_frame.pack(fill=tk.X, pady=5)
         
-        # Radio buttons with different colors for 5, 10, 15, and 20 questions
+        # Radio buttons with different colors; quizzes over 50 questions are
+        # fetched in several API batches
         counts = [("5", "5", "#FF9999"), 
                  ("10", "10", "#99CCFF"), 
                  ("15", "15", "#99FF99"),
-                 ("20", "20", "#FFCC99")]
+                 ("20", "20", "#FFCC99"),
+                 ("50", "50", "#CC99FF"),
+                 ("100", "100", "#FFFF99"),
+                 ("All (marathon)", ALL_QUESTIONS, "#99FFFF")]
         
+        self.count_buttons = {}
         for text, value, color in counts:
             rb = tk.Radiobutton(
                 count_options_frame, text=text, variable=self.count_var,
@@ -310,6 +524,73 @@ class QuizSettingsWindow:
                 activebackground=COLORS['card_bg']
             )
             rb.pack(anchor=tk.W, pady=2)
+            self.count_buttons[value] = rb
+            
+        # How many questions the selected category has, from the count index
+        self.count_hint = tk.Label(
+            count_frame, text="", font=("Arial", 9),
+            bg=COLORS['card_bg'], fg=COLORS['muted']
+        )
+        self.count_hint.pack(anchor=tk.W)
+        
+        # Spaced repetition over the saved questions instead of a fresh draw
+        tk.Checkbutton(
+            count_frame, text="Review mode (missed and due questions first)",
+            variable=self.review_var, bg=COLORS['card_bg'], fg=COLORS['text'],
+            selectcolor=COLORS['secondary'], font=("Arial", 10),
+            activebackground=COLORS['card_bg']
+        ).pack(anchor=tk.W, pady=(5, 0))
+        
+        # Optional time pressure: per question and for the whole quiz
+        time_frame = tk.Frame(content_frame, bg=COLORS['card_bg'])
+        time_frame.pack(fill=tk.X, pady=10)
+        
+        tk.Label(
+            time_frame, text="Time Limit:", 
+            font=("Arial", 12, "bold"), bg=COLORS['card_bg'], fg=COLORS['text']
+        ).pack(anchor=tk.W, pady=(0, 5))
+        
+        for text, limits, var in (("Per question", QUESTION_TIME_LIMITS, self.question_limit_var),
+                                  ("Whole quiz", QUIZ_TIME_LIMITS, self.quiz_limit_var)):
+            row = tk.Frame(time_frame, bg=COLORS['card_bg'])
+            row.pack(fill=tk.X, pady=2)
+            tk.Label(
+                row, text=text, width=12, anchor=tk.W,
+                font=("Arial", 10), bg=COLORS['card_bg'], fg=COLORS['text']
+            ).pack(side=tk.LEFT)
+            ttk.Combobox(
+                row, values=list(limits), width=15, state="readonly",
+                font=("Arial", 10), textvariable=var
+            ).pack(side=tk.LEFT)
+        
+        # Keyword search across every saved question, as an alternative to a category
+        search_frame = tk.Frame(content_frame, bg=COLORS['card_bg'])
+        search_frame.pack(fill=tk.X, pady=10)
+        
+        tk.Label(
+            search_frame, text="Or Search Saved Questions:", 
+            font=("Arial", 12, "bold"), bg=COLORS['card_bg'], fg=COLORS['text']
+        ).pack(anchor=tk.W, pady=(0, 5))
+        
+        search_entry = tk.Entry(
+            search_frame, textvariable=self.search_var, font=("Arial", 10),
+            relief='solid', bd=1
+        )
+        search_entry.pack(fill=tk.X, pady=5)
+        search_entry.bind("<Return>", lambda event: self.start_search_quiz())
+        
+        self.search_hint = tk.Label(
+            search_frame, text="", font=("Arial", 9),
+            bg=COLORS['card_bg'], fg=COLORS['muted']
+        )
+        self.search_hint.pack(anchor=tk.W)
+        
+        tk.Button(
+            search_frame, text="🔎 Quiz From Matches", command=self.start_search_quiz,
+            font=("Arial", 10, "bold"), bg=COLORS['secondary'], fg=COLORS['text'],
+            relief='flat', padx=10, pady=6, cursor='hand2',
+            activebackground=COLORS['card_shadow']
+        ).pack(fill=tk.X, pady=(5, 0))
         
         # Start button with attractive styling
         button_frame = tk.Frame(content_frame, bg=COLORS['card_bg'])
@@ -327,7 +608,191 @@ class QuizSettingsWindow:
         def on_mousewheel(event):
             canvas.yview_scroll(int(-1*(event.delta/120)), "units")
             
-        canvas.bind_all("<MouseWheel>", on_mousewheel)
+        # Bound on the root so it works over every child widget; removed in destroy()
+        self.mousewheel_binding = self.root.bind("<MouseWheel>", on_mousewheel)
+        
+    def destroy(self):
+        """Remove root-level bindings and variable traces along with the widgets"""
+        self.root.unbind("<MouseWheel>", self.mousewheel_binding)
+        for var, trace_id in self.traces:
+            var.trace_remove("write", trace_id)
+        if self.search_bank:
+            self.search_bank.close()
+        super().destroy()
+        
+    def start_category_refresh(self):
+        """Fetch the category list on a worker thread"""
+        self.category_queue = queue.Queue()
+        threading.Thread(
+            target=lambda: self.category_queue.put(refresh_categories()), daemon=True
+        ).start()
+        self.after(100, self.poll_categories)
+        
+    def poll_categories(self):
+        """Apply the refreshed category list once the background fetch returns"""
+        try:
+            categories = self.category_queue.get_nowait()
+        except queue.Empty:
+            self.after(100, self.poll_categories)
+            return
+            
+        if not categories or categories == self.api_categories:
+            return
+            
+        self.api_categories = categories
+        if self.pack is None:
+            self.show_categories(categories)
+            
+    def show_categories(self, categories):
+        """Swap the category list, keeping the current choice if it still exists"""
+        mix = [self.category_map[name] for name in self.selected_mix_names()]
+        self.category_map = categories
+        self.category_combo.config(values=sorted(categories.keys()))
+        if self.category_var.get() not in categories:
+            self.category_combo.set("")
+        self.mix_names = sorted(categories.keys())
+        self.mix_list.delete(0, tk.END)
+        self.mix_list.insert(tk.END, *self.mix_names)
+        self.select_mix(mix)
+        
+    def selected_mix_names(self):
+        return [self.mix_names[i] for i in self.mix_list.curselection()]
+        
+    def select_mix(self, category_ids):
+        """Select the given extra categories in the mix list"""
+        for i, name in enumerate(self.mix_names):
+            if self.category_map.get(name) in category_ids:
+                self.mix_list.selection_set(i)
+                
+    def selected_category_ids(self):
+        """The chosen category followed by any mixed-in ones, without repeats"""
+        category_ids = []
+        for name in [self.category_var.get()] + self.selected_mix_names():
+            cid = self.category_map.get(name)
+            if cid is not None and cid not in category_ids:
+                category_ids.append(cid)
+        return category_ids
+            
+    def apply_source(self):
+        """Switch categories and question counts between the API and a pack"""
+        path = self.packs.get(self.source_var.get())
+        if path is None:
+            self.pack = None
+            self.count_index = self.api_count_index
+            self.show_categories(self.api_categories)
+        else:
+            try:
+                self.pack = QuestionPack(path)
+            except PackError as e:
+                BeautifulModal(self.root, "Pack Error", str(e), "error")
+                self.source_var.set(API_SOURCE)
+                return
+            self.show_categories(self.pack.category_map())
+        self.update_count_options()
+        
+    def start_count_refresh(self):
+        """Rebuild the question count index on a worker thread"""
+        self.count_queue = queue.Queue()
+        category_ids = list(self.api_categories.values())
+        threading.Thread(
+            target=lambda: self.count_queue.put(refresh_question_counts(category_ids)), daemon=True
+        ).start()
+        self.after(100, self.poll_counts)
+        
+    def poll_counts(self):
+        """Apply the refreshed count index once the background fetch returns"""
+        try:
+            index = self.count_queue.get_nowait()
+        except queue.Empty:
+            self.after(100, self.poll_counts)
+            return
+            
+        if index:
+            self.api_count_index = index
+            if self.pack is None:
+                self.count_index = index
+                self.update_count_options()
+        
+    def update_count_options(self):
+        """Disable question counts the selected category cannot fill.
+        
+        Uses only the cached count index, so it runs on every change without
+        a network call. A selection that no longer fits is clamped down to
+        the largest count that does.
+        """
+        if self.pack is not None:
+            # Unlike the API, a pack knows its exact count for each question type
+            self.count_index = self.pack.count_index(self.type_var.get())
+        category_ids = self.selected_category_ids()
+        available = self.count_index.available_across(category_ids)
+        where = "in this category" if len(category_ids) == 1 else "across these categories"
+        self.count_hint.config(
+            text="" if available is None else f"{available} questions available {where}"
+        )
+        
+        def allows(count):
+            return available is None or count is None or count <= available
+            
+        largest_allowed = ALL_QUESTIONS
+        for value, button in self.count_buttons.items():
+            count = parse_question_count(value)
+            allowed = allows(count)
+            button.config(state=tk.NORMAL if allowed else tk.DISABLED)
+            if allowed and count is not None:
+                largest_allowed = value
+                
+        if not allows(parse_question_count(self.count_var.get())):
+            self.count_var.set(largest_allowed)
+        
+    def schedule_search_count(self):
+        """Count matches once typing pauses, rather than on every keystroke"""
+        if self.search_timer is not None:
+            self.root.after_cancel(self.search_timer)
+        self.search_timer = self.after(SEARCH_DELAY_MS, self.update_search_count)
+        
+    def update_search_count(self):
+        """Show how many saved questions match the search (local index only)"""
+        self.search_timer = None
+        text = self.search_var.get().strip()
+        if not text:
+            self.search_hint.config(text="")
+            return
+        if self.search_bank is None:
+            self.search_bank = open_bank()
+            if self.search_bank is None:
+                self.search_hint.config(text="The local question bank is unavailable")
+                return
+                
+        matches = self.search_bank.search_count(text, self.type_var.get(), SEARCH_COUNT_CAP + 1)
+        if matches > SEARCH_COUNT_CAP:
+            self.search_hint.config(text=f"{SEARCH_COUNT_CAP}+ matching questions")
+        else:
+            self.search_hint.config(text=f"{matches} matching question{'s' if matches != 1 else ''}")
+        
+    def start_search_quiz(self):
+        """Start a quiz from the saved questions matching the search"""
+        text = self.search_var.get().strip()
+        if not text:
+            BeautifulModal(self.root, "Missing Search", "Please type a word to search for!", "warning")
+            return
+        self.app.show_quiz(
+            None, self.type_var.get(), parse_question_count(self.count_var.get()), search=text,
+            **self.time_limits()
+        )
+        
+    def time_limits(self):
+        return {
+            "question_seconds": QUESTION_TIME_LIMITS.get(self.question_limit_var.get()),
+            "quiz_seconds": QUIZ_TIME_LIMITS.get(self.quiz_limit_var.get()),
+        }
+        
+    def settings_changed(self):
+        """Drop a prefetched round that no longer matches the selected settings"""
+        self.update_count_options()
+        category_id = self.category_map.get(self.category_var.get())
+        prefetcher.invalidate_if_changed(
+            category_id, self.type_var.get(), parse_question_count(self.count_var.get())
+        )
         
     def start_quiz(self):
         """Start the quiz with selected settings"""
@@ -340,44 +805,84 @@ class QuizSettingsWindow:
         # Get selected values
         category_id = self.category_map[selected_category]
         question_type = self.type_var.get()
-        question_count = int(self.count_var.get())
-        
-        # Close settings window and open quiz window
-        self.root.destroy()
-        
-        # Create quiz window
-        quiz_app = QuizWindow(category_id, question_type, question_count)
-        quiz_app.run()
-        
-    def run(self):
-        """Run the settings window"""
-        self.root.mainloop()
+        question_count = parse_question_count(self.count_var.get())
+        prefetcher.invalidate_if_changed(category_id, question_type, question_count)
+        source = self.pack.path if self.pack else None
+        mix = self.selected_category_ids()[1:]
+        
+        # Swap the settings screen for the quiz
+        self.app.show_quiz(
+            category_id, question_type, question_count, source,
+            review=self.review_var.get(), mix=mix, **self.time_limits()
+        )
 
 # ------------------- Quiz Window ------------------- #
-class QuizWindow:
-    def __init__(self, category_id, question_type, question_count):
-        self.root = tk.Tk()
+FEEDBACK_TIMEOUT_MS = 2500  # Auto-advance after showing answer feedback this long
+URGENT_SECONDS = 5  # The countdown turns orange below this
+MIN_CATEGORY_ANSWERS = 5  # Answers needed before a category counts as strongest/weakest
+
+class QuizWindow(Screen):
+    title = "Quiz Time!"
+    width = 600
+    height = 500
+    feedback_timeout_ms = FEEDBACK_TIMEOUT_MS  # None waits for the Next button
+    seed = None  # Seed for the answer shuffle; None picks a fresh one per quiz
+    
+    def __init__(self, app, category_id, question_type, question_count, source=None, search=None,
+                 review=False, mix=(), question_seconds=None, quiz_seconds=None):
+        super().__init__(app)
         self.category_id = category_id
         self.question_type = question_type
         self.question_count = question_count
-        self.question_list = []
-        self.current_index = 0
-        self.current_score = 0
+        self.source = source  # Path of an offline question pack, or None for the API
+        self.search = search  # Keywords for a quiz built from the local bank
+        self.review = review  # Spaced repetition over the local bank
+        self.mix = tuple(mix)  # Further categories interleaved with category_id
+        self.question_seconds = question_seconds  # Time allowed per question, or None
+        self.quiz_seconds = quiz_seconds  # Time allowed for the whole quiz, or None
+        self.question_countdown = None
+        self.quiz_countdown = None
+        self.time_left = {}
+        self.review_bank = None
+        
+        # Every answer is logged; the session row is created on the first one
+        self.history = open_history()
+        self.player = current_player()
+        self.session_id = None
+        
+        # Quiz state lives in the engine; this window only renders it. The
+        # shuffle is seeded so a recorded session can be replayed exactly
+        if self.seed is None:
+            self.seed = random.randrange(2 ** 32)
+        self.engine = QuizEngine(question_count, rng=random.Random(self.seed))
+        self.recording = None
+        if app.record_dir:
+            self.recording = SessionRecording(self.seed, {
+                "category_id": category_id, "question_type": question_type,
+                "question_count": question_count, "source": source, "search": search,
+                "review": review, "mix": list(self.mix),
+                "question_seconds": question_seconds, "quiz_seconds": quiz_seconds,
+            })
+        
+        # Background loading state: the worker thread posts messages to
+        # load_queue and the Tk thread drains it from poll_loader()
+        self.load_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.loading_dots = 0
+        self.loading_text = "Loading questions"
+        
+        # Answer feedback state and when the current question was shown and answered
+        self.awaiting_feedback = False
+        self.feedback_timer = None
+        self.shown_at = None
+        self.answered_at = None
         
         self.setup_ui()
-        self.fetch_questions()
+        self.start_loader()
         
     def setup_ui(self):
-        self.root.title("Quiz Time!")
-        self.root.config(bg=COLORS['background'])
-        self.root.geometry("600x500")
-        self.root.resizable(False, False)
-        
-        # Center the window on screen
-        self.center_window()
-        
         # Header with score
-        header_frame = tk.Frame(self.root, bg=COLORS['primary'], height=60)
+        header_frame = tk.Frame(self.frame, bg=COLORS['primary'], height=60)
         header_frame.pack(fill=tk.X, padx=10, pady=10)
         header_frame.pack_propagate(False)
         
@@ -388,8 +893,16 @@ class QuizWindow:
         )
         self.score_label.pack(side=tk.RIGHT, padx=20)
         
+        # Countdowns, only in timed quizzes
+        self.timer_label = tk.Label(
+            header_frame, text="", 
+            font=("Arial", 14, "bold"), 
+            bg=COLORS['primary'], fg=COLORS['light']
+        )
+        self.timer_label.pack(side=tk.LEFT, padx=20)
+        
         # Question display
-        self.question_frame = tk.Frame(self.root, bg=COLORS['card_bg'], relief=tk.RAISED, bd=1)
+        self.question_frame = tk.Frame(self.frame, bg=COLORS['card_bg'], relief=tk.RAISED, bd=1)
         self.question_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
         
         self.question_label = tk.Label(
@@ -399,197 +912,589 @@ class QuizWindow:
         )
         self.question_label.pack(expand=True, padx=20, pady=20)
         
+        # Reusable answer feedback, hidden until an answer is given
+        self.feedback = FeedbackBanner(self.question_frame)
+        
+        # Loading indicator with a cancel button, shown while questions download
+        self.loading_frame = tk.Frame(self.question_frame, bg=COLORS['card_bg'])
+        self.loading_frame.pack(pady=(0, 20))
+        
+        self.loading_bar = ttk.Progressbar(self.loading_frame, mode="indeterminate", length=250)
+        self.loading_bar.pack(pady=(0, 10))
+        self.loading_bar.start(15)
+        
+        self.cancel_button = tk.Button(
+            self.loading_frame, text="Cancel", command=self.cancel_loading,
+            font=("Arial", 10, "bold"), bg=COLORS['muted'], fg=COLORS['light'],
+            relief='flat', padx=15, pady=5, cursor='hand2',
+            activebackground=COLORS['text']
+        )
+        self.cancel_button.pack()
+        
         # Answer buttons frame
-        self.answer_frame = tk.Frame(self.root, bg=COLORS['background'])
+        self.answer_frame = tk.Frame(self.frame, bg=COLORS['background'])
         self.answer_frame.pack(fill=tk.X, padx=10, pady=(0, 10))
         
+        self.create_answer_buttons()
+        
         # Progress label
         self.progress_label = tk.Label(
-            self.root, text="Question 0/0", 
+            self.frame, text="Question 0/0", 
             font=("Arial", 10), bg=COLORS['background'], fg=COLORS['muted']
         )
         self.progress_label.pack(pady=(0, 10))
         
-    def center_window(self):
-        """Center the window on the screen"""
-        self.root.update_idletasks()
-        x = (self.root.winfo_screenwidth() // 2) - (600 // 2)
-        y = (self.root.winfo_screenheight() // 2) - (500 // 2)
-        self.root.geometry(f"600x500+{x}+{y}")
+    def create_answer_buttons(self):
+        """Build the answer buttons once; show_question() only reconfigures them"""
+        self.current_answers = []
+        self.current_layout = None
+        
+        # True/False layout
+        self.boolean_frame = tk.Frame(self.answer_frame, bg=COLORS['background'])
+        self.boolean_buttons = []
+        boolean_styles = [
+            ("TRUE", COLORS['accent'], '#059669', tk.LEFT),
+            ("FALSE", COLORS['danger'], '#dc2626', tk.RIGHT)
+        ]
+        for i, (text, color, active_color, side) in enumerate(boolean_styles):
+            btn = tk.Button(
+                self.boolean_frame, text=text, command=lambda i=i: self.choose_answer(i),
+                font=("Arial", 12, "bold"), bg=color, fg=COLORS['light'],
+                relief='flat', padx=20, pady=10, cursor='hand2',
+                activebackground=active_color
+            )
+            btn.pack(side=side, expand=True, padx=5)
+            self.boolean_buttons.append(btn)
+            
+        # Multiple choice layout with distinct colors
+        self.choice_frame = tk.Frame(self.answer_frame, bg=COLORS['background'])
+        self.choice_buttons = []
+        colors = ['#99CCFF', '#99FF99', '#FF9999', '#FFFF99']
+        for i, color in enumerate(colors):
+            btn = tk.Button(
+                self.choice_frame, command=lambda i=i: self.choose_answer(i),
+                font=("Arial", 10), bg=color, fg=COLORS['text'],
+                relief='flat', padx=15, pady=8, cursor='hand2',
+                activebackground=color,
+                wraplength=120, justify='center'
+            )
+            btn.grid(row=i//2, column=i%2, padx=5, pady=5, sticky="nsew")
+            self.choice_buttons.append(btn)
+            
+        # Configure grid to expand properly
+        for i in range(2):
+            self.choice_frame.grid_columnconfigure(i, weight=1)
+            self.choice_frame.grid_rowconfigure(i, weight=1)
+            
+        # Shown on the results screen in place of the answers
+        self.restart_button = tk.Button(
+            self.answer_frame, text="New Quiz", command=self.restart_quiz,
+            font=("Arial", 12, "bold"), bg=COLORS['primary'], fg=COLORS['light'],
+            relief='flat', padx=20, pady=8, cursor='hand2',
+            activebackground=COLORS['primary_hover']
+        )
+        
+    def set_answer_layout(self, layout):
+        """Switch between the boolean, multiple choice and results layouts (None hides all)"""
+        if layout == self.current_layout:
+            return
+            
+        layouts = {
+            "boolean": self.boolean_frame,
+            "multiple": self.choice_frame,
+            "results": self.restart_button
+        }
+        if self.current_layout:
+            layouts[self.current_layout].pack_forget()
+            
+        if layout == "results":
+            self.restart_button.pack(expand=True, pady=10)
+        elif layout:
+            layouts[layout].pack(fill=tk.X)
+        self.current_layout = layout
+        
+    def start_loader(self):
+        """Fetch questions on a worker thread and start polling for results"""
+        self.loader = threading.Thread(target=self.fetch_questions, daemon=True)
+        self.loader.start()
+        self.after(50, self.poll_loader)
+        
+    def destroy(self):
+        """Stop the loader thread along with the screen"""
+        self.cancel_event.set()
+        self.stop_countdowns()
+        if self.history:
+            self.history.close()
+        if self.review_bank:
+            self.review_bank.close()
+        super().destroy()
         
     def fetch_questions(self):
-        """Fetch questions from the API"""
-        try:
-            url = f"https://opentdb.com/api.php?amount={self.question_count}&category={self.category_id}&type={self.question_type}"
-            response = requests.get(url, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+        """Load questions for this quiz (runs on the loader thread)"""
+        def emit(question):
+            self.load_queue.put(("question", question))
             
-            if data.get("response_code", 1) != 0:
-                BeautifulModal(self.root, "API Error", "No questions found for these settings.", "error")
-                self.root.destroy()
-                return
-                
-            questions = data["results"]
-            self.question_list.clear()
+        if self.review:
+            self.load_review()
+            return
+        if self.search:
+            error = load_search_questions(self.search, self.question_type, self.question_count, emit)
+        elif self.mix:
+            error = load_mixed_questions(
+                (self.category_id,) + self.mix, self.question_count, self.load_category, emit,
+                cancel_event=self.cancel_event
+            )
+        elif self.source:
+            error = load_pack_questions(
+                self.source, self.category_id, self.question_type, self.question_count, emit
+            )
+        else:
+            error = load_questions(
+                self.category_id, self.question_type, self.question_count,
+                emit=emit, cancel_event=self.cancel_event, on_wait=self.report_wait
+            )
+        
+        if error:
+            self.load_queue.put(("error", error))
+        else:
+            self.load_queue.put(("done", None))
+    
+    def load_category(self, category_id, count, emit):
+        """Load one category's share of a mixed quiz (runs on a loader pool thread)"""
+        if self.source:
+            return load_pack_questions(self.source, category_id, self.question_type, count, emit)
+        return load_questions(
+            category_id, self.question_type, count,
+            emit=emit, cancel_event=self.cancel_event, on_wait=self.report_wait
+        )
+        
+    def report_wait(self, seconds):
+        self.load_queue.put(("status", f"Waiting {seconds:.0f}s for the trivia API rate limit"))
+        
+    def load_review(self):
+        """Build the review scheduler on the loader thread; questions are drawn as the quiz goes"""
+        bank = open_bank()
+        if self.cancel_event.is_set():
+            if bank:
+                bank.close()
+            return
+        self.review_bank = bank
+        if bank is None:
+            self.load_queue.put(("error", ("Review Error", "The local question bank is unavailable.")))
+            return
+        scheduler = open_review_scheduler(
+            bank, self.history, self.player, self.category_id, self.question_type
+        )
+        if not len(scheduler):
+            self.load_queue.put(("error", (
+                "Nothing To Review", "No saved questions for these settings yet. Play a normal quiz first!"
+            )))
+            return
+        self.load_queue.put(("scheduler", scheduler))
+        
+    def poll_loader(self):
+        """Drain messages from the loader thread on the Tk thread"""
+        if self.cancel_event.is_set():
+            return
             
-            for q in questions:
-                question_text = html.unescape(q["question"])
-                correct_answer = html.unescape(q["correct_answer"])
-                incorrect_answers = [html.unescape(ans) for ans in q["incorrect_answers"]]
+        engine = self.engine
+        try:
+            while True:
+                kind, payload = self.load_queue.get_nowait()
                 
-                if q["type"] == "multiple":
-                    all_answers = incorrect_answers + [correct_answer]
-                    random.shuffle(all_answers)
-                    self.question_list.append((question_text, correct_answer, all_answers))
-                else:
-                    self.question_list.append((question_text, correct_answer, ["True", "False"]))
+                if kind == "question":
+                    engine.add_question(payload)
+                    # Show the first question as soon as it has been parsed
+                    if len(engine.questions) == engine.current_index + 1:
+                        self.show_question()
+                    else:
+                        self.update_progress()
+                elif kind == "scheduler":
+                    # The engine keeps drawing from the scheduler as the quiz goes
+                    engine.use_scheduler(payload)
+                    self.loading_bar.stop()
+                    self.loading_frame.pack_forget()
+                    self.show_question()
+                    return
+                elif kind == "done":
+                    self.finish_loading()
+                    self.prefetch_next_round()
+                    if not engine.questions:
+                        self.restart_quiz()
+                        BeautifulModal(self.root, "Error", "No questions found for these settings.", "error")
+                    elif engine.is_complete():
+                        self.show_results()
+                    else:
+                        self.update_progress()
+                    return
+                elif kind == "status":
+                    self.loading_text = payload
+                elif kind == "error":
+                    self.finish_loading()
+                    title, message = payload
+                    self.restart_quiz()
+                    BeautifulModal(self.root, title, message, "error")
+                    return
+        except queue.Empty:
+            pass
             
-            if not self.question_list:
-                BeautifulModal(self.root, "Error", "No questions found for these settings.", "error")
-                self.root.destroy()
-                return
-                
-            self.show_question()
+        # Animate the loading text until the first question is on screen
+        if not engine.questions:
+            self.loading_dots = (self.loading_dots + 1) % 32
+            self.question_label.config(text=self.loading_text + "." * (self.loading_dots // 8))
             
-        except requests.RequestException:
-            BeautifulModal(self.root, "Connection Error", "Failed to fetch questions. Please check your internet connection.", "error")
-            self.root.destroy()
+        self.after(50, self.poll_loader)
+    
+    def prefetch_next_round(self):
+        """Top up the bank for another round with the same settings"""
+        if not (self.source or self.search or self.review or self.mix):
+            prefetcher.prefetch(self.category_id, self.question_type, self.question_count)
+    
+    def finish_loading(self):
+        """Hide the loading indicator once the loader thread has finished"""
+        self.engine.finish_loading()
+        self.loading_bar.stop()
+        self.loading_frame.pack_forget()
+    
+    def cancel_loading(self):
+        """Abandon the download and go back to the settings window"""
+        self.cancel_event.set()
+        self.restart_quiz()
+    
+    def update_progress(self):
+        """Refresh the progress label, counting questions still downloading"""
+        self.progress_label.config(text=f"Question {self.engine.current_index + 1}/{self.engine.total}")
     
     def show_question(self):
         """Display the current question"""
-        if self.current_index >= len(self.question_list):
+        with metrics.span("show_question"):
+            self.render_question()
+        
+    def render_question(self):
+        engine = self.engine
+        if engine.is_waiting():
+            # Wait for the loader thread; poll_loader() calls back in
+            self.question_label.config(text="Loading questions...")
+            self.set_answer_layout(None)
+            return
+        if engine.is_complete():
             self.show_results()
             return
             
+        # Hide the loading indicator once the user has something to answer
+        if engine.loading:
+            self.loading_frame.pack_forget()
+            
         # Update progress
-        self.progress_label.config(text=f"Question {self.current_index + 1}/{len(self.question_list)}")
+        self.update_progress()
         
-        # Clear previous answer buttons
-        for widget in self.answer_frame.winfo_children():
-            widget.destroy()
-            
         # Get current question data
-        question_data = self.question_list[self.current_index]
-        question_text = question_data[0]
-        correct_answer = question_data[1]
-        all_answers = question_data[2]
+        question = engine.current_question()
+        all_answers = engine.current_choices()
+        self.current_answers = all_answers
         
         # Display question
-        self.question_label.config(text=question_text)
-        
-        # Create answer buttons based on question type
-        if self.question_type == "boolean":
-            # True/False buttons
-            true_button = tk.Button(
-                self.answer_frame, text="TRUE", command=lambda: self.check_answer("True", correct_answer),
-                font=("Arial", 12, "bold"), bg=COLORS['accent'], fg=COLORS['light'],
-                relief='flat', padx=20, pady=10, cursor='hand2',
-                activebackground='#059669'
-            )
-            true_button.pack(side=tk.LEFT, expand=True, padx=5)
-            
-            false_button = tk.Button(
-                self.answer_frame, text="FALSE", command=lambda: self.check_answer("False", correct_answer),
-                font=("Arial", 12, "bold"), bg=COLORS['danger'], fg=COLORS['light'],
-                relief='flat', padx=20, pady=10, cursor='hand2',
-                activebackground='#dc2626'
-            )
-            false_button.pack(side=tk.RIGHT, expand=True, padx=5)
+        self.question_label.config(text=question.text)
+        
+        # Reuse the pooled answer buttons for this question type
+        if question.type == "boolean":
+            self.set_answer_layout("boolean")
         else:
-            # Multiple choice buttons with distinct colors
-            colors = ['#99CCFF', '#99FF99', '#FF9999', '#FFFF99']
-            for i, answer in enumerate(all_answers):
-                btn = tk.Button(
-                    self.answer_frame, text=answer, 
-                    command=lambda ans=answer: self.check_answer(ans, correct_answer),
-                    font=("Arial", 10), bg=colors[i], fg=COLORS['text'],
-                    relief='flat', padx=15, pady=8, cursor='hand2',
-                    activebackground=colors[i],
-                    wraplength=120, justify='center'
-                )
-                btn.grid(row=i//2, column=i%2, padx=5, pady=5, sticky="nsew")
-                
-            # Configure grid to expand properly
-            for i in range(2):
-                self.answer_frame.grid_columnconfigure(i, weight=1)
-            for i in range(2):
-                self.answer_frame.grid_rowconfigure(i, weight=1)
+            self.set_answer_layout("multiple")
+            for btn, answer in zip(self.choice_buttons, all_answers):
+                btn.config(text=answer)
+                btn.grid()
+            for btn in self.choice_buttons[len(all_answers):]:
+                btn.grid_remove()
+        self.shown_at = time.perf_counter()
+        
+        # Re-stamp once Tk has drawn the question, so response times and the
+        # question's countdown start when the player can actually see it
+        index = engine.current_index
+        self.root.after_idle(lambda: self.question_drawn(index))
+        if self.quiz_seconds and self.quiz_countdown is None:
+            self.start_quiz_countdown()
+        
+    def question_drawn(self, index):
+        if not self.active or self.awaiting_feedback or self.engine.current_index != index:
+            return
+        self.shown_at = time.perf_counter()
+        self.start_question_countdown()
+        
+    # Timed mode
+    def start_question_countdown(self):
+        if self.question_seconds and self.question_countdown is None:
+            self.question_countdown = Countdown(
+                self.after, self.root.after_cancel, self.question_seconds,
+                lambda left: self.show_time_left("question", left), self.question_timed_out
+            ).start()
+            
+    def start_quiz_countdown(self):
+        self.quiz_countdown = Countdown(
+            self.after, self.root.after_cancel, self.quiz_seconds,
+            lambda left: self.show_time_left("quiz", left), self.quiz_timed_out
+        ).start()
+        
+    def stop_question_countdown(self):
+        if self.question_countdown:
+            self.question_countdown.stop()
+            self.question_countdown = None
+        if self.time_left.pop("question", None) is not None:
+            self.show_time_left()
+            
+    def stop_countdowns(self):
+        self.stop_question_countdown()
+        if self.quiz_countdown:
+            self.quiz_countdown.stop()
+            
+    def show_time_left(self, kind=None, seconds=None):
+        """Redraw the countdowns in the header"""
+        if kind:
+            self.time_left[kind] = seconds
+        parts = []
+        if "question" in self.time_left:
+            parts.append(f"⏱ {self.time_left['question']}s")
+        if "quiz" in self.time_left:
+            parts.append(f"🏁 {format_clock(self.time_left['quiz'])}")
+        urgent = bool(self.time_left) and min(self.time_left.values()) <= URGENT_SECONDS
+        self.timer_label.config(
+            text="   ".join(parts), fg=COLORS['warning'] if urgent else COLORS['light']
+        )
+        
+    def question_timed_out(self):
+        """The question's time ran out: show the answer and count it as a miss"""
+        self.stop_question_countdown()
+        if self.awaiting_feedback:
+            return
+        self.awaiting_feedback = True
+        self.answered_at = time.perf_counter()
+        if self.recording:
+            self.recording.add_event("timeout", index=self.engine.current_index)
+        metrics.incr("question_timeouts")
+        
+        _, correct_answer = self.engine.time_out()
+        self.show_feedback("Time's up! ⏰", f"The correct answer was: {correct_answer}", "warning", False)
+        
+    def quiz_timed_out(self):
+        """The quiz's time ran out: the question on screen and any unasked ones are misses"""
+        self.quiz_countdown = None
+        if self.recording:
+            self.recording.add_event("quiz_timeout")
+        metrics.incr("quiz_timeouts")
+        
+        self.stop_question_countdown()
+        if self.feedback_timer is not None:
+            self.root.after_cancel(self.feedback_timer)
+            self.feedback_timer = None
+        if self.awaiting_feedback:
+            self.feedback.frame.pack_forget()
+            self.feedback.on_dismiss = None
+            self.awaiting_feedback = False
+        elif self.engine.current_question() is not None:
+            self.answered_at = time.perf_counter()
+            self.engine.time_out()
+            self.log_answer(False)
+            
+        # Stop downloading questions nobody will see
+        self.cancel_event.set()
+        self.finish_loading()
+        self.engine.stop()
+        self.show_results()
     
-    def check_answer(self, user_answer, correct_answer):
+    def choose_answer(self, index):
+        """Handle a click on one of the pooled answer buttons"""
+        self.check_answer(self.current_answers[index])
+    
+    def check_answer(self, user_answer):
         """Check if the user's answer is correct"""
-        if user_answer == correct_answer:
-            self.current_score += 1
-            self.score_label.config(text=f"Score: {self.current_score}")
-            BeautifulModal(self.root, "Correct! 🎉", "Your answer is correct!", "success")
+        if self.awaiting_feedback:
+            return
+        self.awaiting_feedback = True
+        self.answered_at = time.perf_counter()
+        self.stop_question_countdown()
+        if self.recording:
+            self.recording.add_event("answer", index=self.engine.current_index, answer=user_answer)
+        if self.shown_at is not None:
+            metrics.observe("think_time", self.answered_at - self.shown_at)
+        
+        is_correct, correct_answer = self.engine.answer(user_answer)
+        if is_correct:
+            self.score_label.config(text=f"Score: {self.engine.score}")
+            self.show_feedback("Correct! 🎉", "Your answer is correct!", "success", True)
         else:
-            BeautifulModal(self.root, "Incorrect 😞", f"Sorry, the correct answer was: {correct_answer}", "error")
-        
-        # Move to next question after modal is closed
-        self.root.after(100, self.next_question)
+            self.show_feedback(
+                "Incorrect 😞", f"Sorry, the correct answer was: {correct_answer}", "error", False
+            )
+    
+    def show_feedback(self, title, message, modal_type, is_correct):
+        """Show the answer feedback and log the answer"""
+        self.feedback.show(title, message, modal_type, self.advance)
+        metrics.observe("answer_feedback", time.perf_counter() - self.answered_at)
+        self.log_answer(is_correct)
+        
+        # Move on when the feedback is dismissed, or by itself after a timeout
+        if self.feedback_timeout_ms is not None:
+            self.feedback_timer = self.after(self.feedback_timeout_ms, self.dismiss_feedback)
+    
+    def log_answer(self, is_correct):
+        """Append the current answer to the attempt history"""
+        if not self.history:
+            return
+        if self.session_id is None:
+            source = ("review" if self.review else "search" if self.search
+                      else "pack" if self.source else "opentdb")
+            self.session_id = self.history.start_session(
+                self.player, source, self.category_id, self.question_type
+            )
+        response_time = self.answered_at - self.shown_at if self.shown_at is not None else 0.0
+        self.history.record_answer(
+            self.session_id, self.player, self.engine.current_question(), is_correct, response_time
+        )
+    
+    def dismiss_feedback(self):
+        """Close the answer feedback, which advances to the next question"""
+        if self.awaiting_feedback:
+            self.feedback.dismiss()
+    
+    def advance(self):
+        """Called once the feedback for the current answer has been dismissed"""
+        if self.feedback_timer is not None:
+            self.root.after_cancel(self.feedback_timer)
+            self.feedback_timer = None
+        self.awaiting_feedback = False
+        if self.recording:
+            self.recording.add_event("next")
+        
+        with metrics.span("next_question"):
+            self.next_question()
     
     def next_question(self):
         """Move to the next question"""
-        self.current_index += 1
+        self.engine.advance()
         self.show_question()
     
     def show_results(self):
         """Show the final results"""
-        # Clear the question and answer frames
-        self.question_label.config(text="")
-        for widget in self.answer_frame.winfo_children():
-            widget.destroy()
-            
-        # Calculate percentage
-        percentage = (self.current_score / len(self.question_list)) * 100
-        
-        # Performance message
-        if percentage >= 80:
-            performance = "Outstanding! 🏆"
-            color = COLORS['accent']
-            modal_type = "success"
-        elif percentage >= 60:
-            performance = "Good job! 👍"
-            color = COLORS['primary']
-            modal_type = "info"
-        elif percentage >= 40:
-            performance = "Keep learning! 📚"
-            color = COLORS['warning']
-            modal_type = "warning"
-        else:
-            performance = "Try again! 💪"
-            color = COLORS['danger']
-            modal_type = "error"
-            
-        # Display results
-        result_text = f"Quiz Complete!\n\n{performance}\n\nFinal Score: {self.current_score}/{len(self.question_list)}\nPercentage: {percentage:.1f}%"
-        result_label = tk.Label(
-            self.question_frame, text=result_text,
-            font=("Arial", 14, "bold"), bg=COLORS['card_bg'], fg=color,
-            justify=tk.CENTER
-        )
-        result_label.pack(expand=True)
-        
-        # Add a restart button
-        restart_button = tk.Button(
-            self.answer_frame, text="New Quiz", command=self.restart_quiz,
-            font=("Arial", 12, "bold"), bg=COLORS['primary'], fg=COLORS['light'],
-            relief='flat', padx=20, pady=8, cursor='hand2',
-            activebackground=COLORS['primary_hover']
-        )
-        restart_button.pack(expand=True, pady=10)
+        self.stop_countdowns()
+        self.set_answer_layout("results")
+        
+        result = self.engine.result()
+        color = MODAL_COLORS.get(result.band, COLORS['primary'])
+        
+        # Display results in the question area
+        result_text = f"Quiz Complete!\n\n{result.message}\n\nFinal Score: {result.score}/{result.total}\nPercentage: {result.percentage:.1f}%"
+        self.question_label.config(text=result_text, font=("Arial", 14, "bold"), fg=color)
+        
+        if self.history and self.session_id is not None:
+            self.history.finish_session(self.session_id, result.score, result.total)
+        if self.recording:
+            try:
+                self.recording.save(self.app.record_dir, self.engine.questions, result.score)
+            except OSError as e:
+                BeautifulModal(self.root, "Recording Error", f"Could not save the session: {e}", "warning")
+            self.recording = None
+        trends = self.history_summary()
+        if trends:
+            tk.Label(
+                self.question_frame, text=trends, font=("Arial", 10),
+                bg=COLORS['card_bg'], fg=COLORS['muted'], wraplength=500, justify=tk.CENTER
+            ).pack(pady=(0, 10))
+    
+    def history_summary(self):
+        """Trend lines for the results screen, read from the running totals"""
+        if not self.history:
+            return ""
+        overall = self.history.totals(self.player)
+        if not overall.answers:
+            return ""
+        week = self.history.recent(self.player)
+        lines = [
+            f"Last {TREND_DAYS} days: {week.accuracy:.0f}% correct · "
+            f"All time: {overall.accuracy:.0f}% over {overall.answers} answers",
+            f"Average answer time: {overall.mean_response:.1f}s",
+        ]
+        
+        categories = {
+            name: totals for name, totals in self.history.breakdown(self.player, "category").items()
+            if totals.answers >= MIN_CATEGORY_ANSWERS
+        }
+        if len(categories) >= 2:
+            best = max(categories, key=lambda name: categories[name].accuracy)
+            worst = min(categories, key=lambda name: categories[name].accuracy)
+            lines.append(
+                f"Strongest: {best} ({categories[best].accuracy:.0f}%) · "
+                f"Weakest: {worst} ({categories[worst].accuracy:.0f}%)"
+            )
+        return "\n".join(lines)
     
     def restart_quiz(self):
         """Restart the quiz by going back to settings"""
-        self.root.destroy()
-        settings_app = QuizSettingsWindow()
-        settings_app.run()
+        self.app.show_settings(
+            self.category_id, self.question_type, self.question_count, self.source, self.search,
+            self.review, self.mix, self.question_seconds, self.quiz_seconds
+        )
+
+# ------------------- Application ------------------- #
+class QuizApp:
+    """Owns the single Tk root and swaps screens inside it"""
+    
+    def __init__(self, record_dir=None):
+        self.root = tk.Tk()
+        self.root.config(bg=COLORS['background'])
+        self.root.resizable(False, False)
+        self.screen = None
+        self.record_dir = record_dir  # Save each finished quiz here for replay
+        
+    def configure_window(self, title, width, height):
+        """Resize and re-center the root window for a new screen"""
+        self.root.title(title)
+        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.root.winfo_screenheight() // 2) - (height // 2)
+        self.root.geometry(f"{width}x{height}+{x}+{y}")
+        
+    def show(self, screen_class, *args):
+        """Replace the current screen with a new one"""
+        if self.screen is not None:
+            self.screen.destroy()
+        self.screen = screen_class(self, *args)
+        return self.screen
+        
+    def show_settings(self, category_id=None, question_type="multiple", question_count=10,
+                      source=None, search=None, review=False, mix=(), question_seconds=None,
+                      quiz_seconds=None):
+        return self.show(
+            QuizSettingsWindow, category_id, question_type, question_count, source, search, review,
+            mix, question_seconds, quiz_seconds
+        )
+        
+    def show_quiz(self, category_id, question_type, question_count, source=None, search=None,
+                  review=False, mix=(), question_seconds=None, quiz_seconds=None):
+        return self.show(
+            QuizWindow, category_id, question_type, question_count, source, search, review, mix,
+            question_seconds, quiz_seconds
+        )
         
     def run(self):
-        """Run the quiz window"""
+        """Show the settings screen and run the Tk event loop"""
+        self.show_settings()
         self.root.mainloop()
 
 # ------------------- Main Application ------------------- #
 if __name__ == "__main__":
-    settings_app = QuizSettingsWindow()
-    settings_app.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="QuizMaster trivia quiz")
+    parser.add_argument(
+        "--metrics", metavar="DIR",
+        help=f"write timing metrics to DIR (or set {metrics.METRICS_ENV})"
+    )
+    parser.add_argument(
+        "--record", metavar="DIR",
+        help="save every finished quiz to DIR for benchmarks/replay_session.py"
+    )
+    args = parser.parse_args()
+    if args.metrics:
+        metrics.recorder.enable(args.metrics)
+    else:
+        metrics.enable_from_env()
+        
+    app = QuizApp(record_dir=args.record)
+    app.run()
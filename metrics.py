@@ -0,0 +1,190 @@
+"""Lightweight timing spans and counters for the app's hot paths.
+
+Disabled by default, in which case span() hands back a shared no-op context
+manager and incr()/observe() return immediately. Enable it with the
+--metrics DIR flag or the QUIZMASTER_METRICS=DIR environment variable; the
+directory then receives:
+
+* quizmaster.jsonl - one JSON object per finished span or counter change;
+* quizmaster.prom - Prometheus text format, rewritten atomically every few
+  seconds and at exit, for the node exporter's textfile collector.
+"""
+import atexit
+import collections
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+METRICS_ENV = "QUIZMASTER_METRICS"
+JSONL_FILE = "quizmaster.jsonl"
+PROM_FILE = "quizmaster.prom"
+EXPORT_INTERVAL = 10.0  # Seconds between rewrites of the Prometheus file
+PREFIX = "quizmaster"
+
+# Histogram bucket upper bounds in seconds; wide enough for think time
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger("quizmaster.metrics")
+
+NULL_SPAN = contextlib.nullcontext()
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def format_labels(key, **extra):
+    pairs = list(key) + sorted(extra.items())
+    if not pairs:
+        return ""
+    body = ",".join(f'{name}="{str(value)}"' for name, value in pairs)
+    return "{" + body + "}"
+
+class Histogram:
+    """Cumulative bucket counts plus count and sum, as Prometheus expects"""
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+
+class Span:
+    def __init__(self, recorder, name, labels):
+        self.recorder = recorder
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.recorder.observe(self.name, time.perf_counter() - self.started, **self.labels)
+        return False
+
+class MetricsRecorder:
+    """Collects span timings and counters and exports them to disk"""
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.directory = None
+        self.events = None
+        self.histograms = collections.defaultdict(Histogram)
+        self.counters = collections.Counter()
+        self.last_export = 0.0
+
+    def enable(self, directory):
+        """Start recording into directory (created if needed)"""
+        with self.lock:
+            if self.enabled:
+                return
+            try:
+                os.makedirs(directory, exist_ok=True)
+                self.events = open(os.path.join(directory, JSONL_FILE), "a", encoding="utf-8")
+            except OSError as e:
+                logger.warning("Metrics disabled: cannot write to %s: %s", directory, e)
+                return
+            self.directory = directory
+            self.enabled = True
+        atexit.register(self.close)
+
+    def span(self, name, **labels):
+        """Time a block: with metrics.span("question_fetch"): ..."""
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, labels)
+
+    def observe(self, name, seconds, **labels):
+        """Record a duration measured elsewhere"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.histograms[(name, label_key(labels))].observe(seconds)
+            self.write_event({"span": name, "ms": round(seconds * 1000, 3), **labels})
+
+    def incr(self, name, amount=1, **labels):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[(name, label_key(labels))] += amount
+            self.write_event({"counter": name, "inc": amount, **labels})
+
+    def write_event(self, event):
+        """Append an event and export periodically (caller holds the lock)"""
+        if self.events is None:
+            return
+        self.events.write(json.dumps({"ts": round(time.time(), 3), **event}) + "\n")
+        now = time.monotonic()
+        if now - self.last_export >= EXPORT_INTERVAL:
+            self.last_export = now
+            self.events.flush()
+            self.export_prometheus()
+
+    def prometheus_text(self):
+        lines = []
+        span_metric = f"{PREFIX}_span_seconds"
+        if self.histograms:
+            lines.append(f"# HELP {span_metric} Time spent in instrumented code paths.")
+            lines.append(f"# TYPE {span_metric} histogram")
+        for (name, key), hist in sorted(self.histograms.items()):
+            for bound, count in zip(BUCKETS, hist.buckets):
+                lines.append(f"{span_metric}_bucket{format_labels(key, span=name, le=bound)} {count}")
+            lines.append(f'{span_metric}_bucket{format_labels(key, span=name, le="+Inf")} {hist.count}')
+            lines.append(f"{span_metric}_sum{format_labels(key, span=name)} {hist.total:.6f}")
+            lines.append(f"{span_metric}_count{format_labels(key, span=name)} {hist.count}")
+
+        declared = set()
+        for (name, key), value in sorted(self.counters.items()):
+            metric = f"{PREFIX}_{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{format_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export_prometheus(self):
+        """Atomically rewrite the .prom file so a scrape never sees half of it"""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{PROM_FILE}.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, os.path.join(self.directory, PROM_FILE))
+        except OSError as e:
+            logger.warning("Could not export metrics: %s", e)
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def close(self):
+        """Flush both files; called at interpreter exit"""
+        with self.lock:
+            if not self.enabled:
+                return
+            self.export_prometheus()
+            self.events.close()
+            self.events = None
+            self.enabled = False
+
+# Process-wide recorder; the module-level helpers below are what callers use
+recorder = MetricsRecorder()
+span = recorder.span
+observe = recorder.observe
+incr = recorder.incr
+
+def enable_from_env():
+    """Turn metrics on if QUIZMASTER_METRICS names a directory"""
+    directory = os.environ.get(METRICS_ENV)
+    if directory:
+        recorder.enable(directory)
@@ -0,0 +1,508 @@
+import collections
+import html
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+from question_model import Question
+
+BASE_URL = os.environ.get("OPENTDB_BASE_URL", "https://opentdb.com/")
+
+# Per-endpoint (connect, read) timeouts in seconds
+TIMEOUTS = {
+    "api_category.php": (3.05, 10),
+    "api.php": (3.05, 15),
+    "api_token.php": (3.05, 10),
+    "api_count.php": (3.05, 10),
+    "api_count_global.php": (3.05, 10),
+}
+DEFAULT_TIMEOUT = (3.05, 10)
+
+# HTTP statuses worth retrying; anything else is returned to the caller
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# OpenTDB allows one question request per IP every 5 seconds
+RATE_LIMIT_INTERVAL = 5.0
+RATE_LIMITED_ENDPOINTS = {"api.php"}
+CANCEL_POLL_SECONDS = 0.1  # How often a queued request checks whether it was cancelled
+
+# response_code values documented at https://opentdb.com/api_config.php
+RESPONSE_MESSAGES = {
+    1: "Not enough questions are available for these settings.",
+    2: "The request contained an invalid parameter.",
+    3: "The session token does not exist.",
+    4: "The session token has returned every available question.",
+    5: "Too many requests were made to the trivia API.",
+}
+# api.php returns at most this many questions per request
+BATCH_SIZE = 50
+MAX_PARALLEL_BATCHES = 3
+
+RATE_LIMIT_CODE = 5
+TOKEN_NOT_FOUND_CODE = 3
+TOKEN_EMPTY_CODE = 4
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+USER_AGENT = "QuizMaster-Tkinter"
+
+logger = logging.getLogger("quizmaster.opentdb")
+
+class RequestError(Exception):
+    """A request to the trivia API failed"""
+
+class TransientError(RequestError):
+    """Connection failure or timeout that is worth retrying"""
+
+class OpenTDBError(RequestError):
+    """The API answered with a non-zero response_code"""
+
+    def __init__(self, code):
+        self.code = code
+        super().__init__(RESPONSE_MESSAGES.get(code, f"Unexpected response code {code}."))
+
+class RequestCancelled(RequestError):
+    """The caller gave up while the request was waiting for its slot"""
+
+# ------------------- Request Scheduler ------------------- #
+class RequestScheduler:
+    """Hands out request slots in FIFO order, spaced by the API rate limit.
+
+    Slots are not reserved up front: callers queue, and the one at the head
+    goes once an interval has passed since the last request. A caller that
+    is cancelled while queued simply leaves, and everyone behind it moves up
+    a slot instead of waiting out one that was never used.
+    """
+
+    def __init__(self, interval=RATE_LIMIT_INTERVAL, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.queue = collections.deque()
+        self.not_before = 0.0  # The head of the queue may not go before this
+
+    def expected_wait(self, ticket, now):
+        position = self.queue.index(ticket)
+        return max(now, self.not_before) + position * self.interval - now
+
+    def acquire(self, on_wait=None, cancel_event=None):
+        """Block until this caller's slot comes up and return the seconds waited.
+
+        Raises RequestCancelled if cancel_event is set while waiting.
+        """
+        ticket = object()
+        with self.condition:
+            started = self.clock()
+            self.queue.append(ticket)
+            expected = self.expected_wait(ticket, started)
+        if expected > 0 and on_wait:
+            on_wait(expected)
+
+        with self.condition:
+            try:
+                while True:
+                    now = self.clock()
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise RequestCancelled("Request cancelled while queued")
+                    if self.queue[0] is ticket:
+                        if now >= self.not_before:
+                            break
+                        timeout = self.not_before - now
+                    else:
+                        timeout = None  # Woken when the queue moves
+                    if cancel_event is not None:
+                        timeout = min(timeout or CANCEL_POLL_SECONDS, CANCEL_POLL_SECONDS)
+                    self.condition.wait(timeout)
+            finally:
+                self.queue.remove(ticket)
+                self.condition.notify_all()
+            self.not_before = now + self.interval
+
+        wait = now - started
+        metrics.observe("rate_limit_wait", wait)
+        return wait
+
+    def defer(self, seconds):
+        """Push every future slot back, e.g. after the server reports a rate limit"""
+        with self.condition:
+            self.not_before = max(self.not_before, self.clock() + seconds)
+
+# ------------------- HTTP Transports ------------------- #
+class HTTPResponse:
+    """Status, headers and body of a completed GET"""
+
+    def __init__(self, status_code, headers, content):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content.decode("utf-8"))
+
+class RequestsTransport:
+    """Pooled keep-alive transport built on requests (imported on first use)"""
+
+    def __init__(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.requests = requests
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+
+    def get(self, url, params, timeout):
+        try:
+            response = self.session.get(url, params=params, timeout=timeout)
+        except (self.requests.ConnectionError, self.requests.Timeout) as e:
+            raise TransientError(str(e)) from e
+        except self.requests.RequestException as e:
+            raise RequestError(str(e)) from e
+        return HTTPResponse(response.status_code, response.headers, response.content)
+
+class UrllibTransport:
+    """Standard library fallback used when requests is not installed"""
+
+    def get(self, url, params, timeout):
+        import socket
+        import urllib.error
+        import urllib.parse
+        import urllib.request
+
+        if params:
+            url = f"{url}?{urllib.parse.urlencode(params)}"
+        request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+        try:
+            # urllib has a single timeout; use the larger read timeout
+            with urllib.request.urlopen(request, timeout=max(timeout)) as response:
+                return HTTPResponse(response.status, response.headers, response.read())
+        except urllib.error.HTTPError as e:
+            return HTTPResponse(e.code, e.headers, e.read())
+        except (urllib.error.URLError, socket.timeout, ConnectionError) as e:
+            raise TransientError(str(e)) from e
+
+def create_transport():
+    """Use requests when it is installed, otherwise urllib"""
+    try:
+        return RequestsTransport()
+    except ImportError:
+        logger.info("requests is not installed, falling back to urllib")
+        return UrllibTransport()
+
+# ------------------- OpenTDB Client ------------------- #
+class OpenTDBClient:
+    """Keep-alive HTTP client for the Open Trivia Database with bounded retries"""
+
+    def __init__(self, base_url=BASE_URL, max_retries=3, backoff_base=0.5, backoff_cap=8.0,
+                 scheduler=None, rate_limit_retries=3):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.scheduler = scheduler or RequestScheduler()
+        self.rate_limit_retries = rate_limit_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.transport_lock = threading.Lock()
+        self.transport = None
+        self.token_lock = threading.Lock()
+        self.token = None
+
+    def get_transport(self):
+        """Create the transport on first use so the HTTP stack is only imported when needed"""
+        with self.transport_lock:
+            if self.transport is None:
+                self.transport = create_transport()
+            return self.transport
+
+    def backoff_delay(self, attempt):
+        """Full-jitter exponential backoff for the given retry attempt"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def get_json(self, endpoint, params=None):
+        """GET an endpoint and decode its JSON body, retrying transient failures.
+
+        Raises RequestError once the retries are exhausted or the response
+        cannot be decoded.
+        """
+        url = self.base_url + endpoint
+        timeout = TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT)
+        transport = self.get_transport()
+
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if attempt:
+                metrics.incr("retries", endpoint=endpoint)
+            metrics.incr("requests", endpoint=endpoint)
+            try:
+                with metrics.span("http_request", endpoint=endpoint):
+                    response = transport.get(url, params, timeout)
+            except TransientError:
+                if last_attempt:
+                    raise
+                time.sleep(self.backoff_delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUSES and not last_attempt:
+                time.sleep(self.retry_after(response) or self.backoff_delay(attempt))
+                continue
+            if response.status_code >= 400:
+                raise RequestError(f"HTTP {response.status_code} from {endpoint}")
+            try:
+                with metrics.span("json_decode", endpoint=endpoint):
+                    return response.json()
+            except ValueError as e:
+                raise RequestError(f"Invalid JSON from {endpoint}: {e}")
+
+    def retry_after(self, response):
+        """Seconds requested by a Retry-After header, if any"""
+        try:
+            return min(self.backoff_cap, float(response.headers.get("Retry-After", "")))
+        except ValueError:
+            return None
+
+    def categories(self):
+        """Return the category list as {name: id}"""
+        data = self.get_json("api_category.php")
+        try:
+            return {cat["name"]: cat["id"] for cat in data["trivia_categories"]}
+        except (KeyError, TypeError) as e:
+            raise RequestError(f"Malformed category response: {e}")
+
+    def category_counts(self, category_id):
+        """Return {"total": n, "easy": n, "medium": n, "hard": n} for a category"""
+        data = self.get_json("api_count.php", {"category": category_id})
+        try:
+            counts = data["category_question_count"]
+            return {
+                "total": int(counts["total_question_count"]),
+                **{d: int(counts[f"total_{d}_question_count"]) for d in DIFFICULTIES},
+            }
+        except (KeyError, TypeError, ValueError) as e:
+            raise RequestError(f"Malformed count response for category {category_id}: {e}")
+
+    def global_counts(self):
+        """Return {category_id: verified question count} for every category"""
+        data = self.get_json("api_count_global.php")
+        try:
+            return {
+                int(cid): int(counts["total_num_of_verified_questions"])
+                for cid, counts in data["categories"].items()
+            }
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise RequestError(f"Malformed global count response: {e}")
+
+    def call(self, endpoint, params=None, on_wait=None, cancel_event=None):
+        """Make a scheduled API call and check its response_code.
+
+        Rate-limited responses (code 5) are retried on the next free slot;
+        other non-zero codes except 1 (no results) raise OpenTDBError.
+        """
+        for attempt in range(self.rate_limit_retries + 1):
+            if endpoint in RATE_LIMITED_ENDPOINTS:
+                wait = self.scheduler.acquire(on_wait, cancel_event)
+                logger.info("%s waited %.2fs in the request queue", endpoint, wait)
+
+            data = self.get_json(endpoint, params)
+            code = data.get("response_code", 0) if isinstance(data, dict) else 0
+            if code == RATE_LIMIT_CODE and attempt < self.rate_limit_retries:
+                logger.info("%s was rate limited, retrying", endpoint)
+                metrics.incr("rate_limited", endpoint=endpoint)
+                self.scheduler.defer(self.scheduler.interval)
+                continue
+            if code not in (0, 1):
+                raise OpenTDBError(code)
+            return data
+
+    def request_token(self):
+        """Ask the API for a new session token"""
+        data = self.get_json("api_token.php", {"command": "request"})
+        if data.get("response_code") != 0 or not data.get("token"):
+            raise OpenTDBError(data.get("response_code", TOKEN_NOT_FOUND_CODE))
+        return data["token"]
+
+    def session_token(self, refresh=False):
+        """Return the session token that stops the API repeating questions"""
+        with self.token_lock:
+            if self.token is None or refresh:
+                self.token = self.request_token()
+            return self.token
+
+    def reset_token(self):
+        """Clear the questions already served to the current session token"""
+        with self.token_lock:
+            if self.token is None:
+                return
+            data = self.get_json("api_token.php", {"command": "reset", "token": self.token})
+            if data.get("response_code") != 0:
+                self.token = None
+
+    def questions(self, amount, category, question_type, on_wait=None, cancel_event=None,
+                  use_token=True, reset_exhausted=True, token=None):
+        """Return the raw api.php payload for the given settings.
+
+        With use_token the session token is sent so questions are not
+        repeated; a missing token is replaced and an exhausted one reset
+        (or reported as OpenTDBError code 4 when reset_exhausted is False).
+        A token from request_token() is sent as is instead, and its errors
+        are raised. question_type None asks for either type.
+        """
+        params = {"amount": amount, "category": category}
+        if question_type:
+            params["type"] = question_type
+        if token is not None:
+            params["token"] = token
+            return self.call("api.php", params, on_wait, cancel_event)
+        if use_token:
+            try:
+                params["token"] = self.session_token()
+            except OpenTDBError:
+                use_token = False
+
+        try:
+            return self.call("api.php", params, on_wait, cancel_event)
+        except OpenTDBError as e:
+            if not use_token or e.code not in (TOKEN_NOT_FOUND_CODE, TOKEN_EMPTY_CODE):
+                raise
+            if e.code == TOKEN_EMPTY_CODE and not reset_exhausted:
+                raise
+            token_error = e.code
+
+        if token_error == TOKEN_NOT_FOUND_CODE:
+            params["token"] = self.session_token(refresh=True)
+        else:
+            self.reset_token()
+            params["token"] = self.session_token()
+        return self.call("api.php", params, on_wait, cancel_event)
+
+    def question_batches(self, count, category, question_type, on_wait=None, cancel_event=None,
+                         max_workers=MAX_PARALLEL_BATCHES, total=None):
+        """Yield (questions, error) for each api.php batch needed for count questions.
+
+        Batches of up to BATCH_SIZE run on a small thread pool: the scheduler
+        still spaces the requests by the rate limit, but their network time
+        overlaps. Batches are yielded, decoded, as soon as each completes.
+
+        With count=None the whole category is fetched under a token of its
+        own, so questions served to earlier rounds are included. total, the
+        category's size from the count index, sizes every batch up front;
+        without it (or if it turns out too high) batches continue until the
+        API runs short, then progressively smaller requests pick up the
+        remainder.
+        """
+        exhaustive = count is None
+        remaining = total if exhaustive else count  # None: size unknown
+        tail_amount = None
+        finished = False
+        pending = {}
+
+        token = None
+        if exhaustive:
+            try:
+                token = self.request_token()
+            except RequestError as e:
+                yield [], e
+                return
+
+        def fetch(amount):
+            with metrics.span("question_fetch"):
+                data = self.questions(
+                    amount, category, question_type, on_wait, cancel_event,
+                    reset_exhausted=not exhaustive, token=token
+                )
+            if data.get("response_code") != 0:
+                return []
+            with metrics.span("question_decode"):
+                return decode_questions(data["results"])
+
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="opentdb-batch")
+
+        def fill():
+            nonlocal remaining
+            # Once the category runs short, probe the remainder one request at a time
+            limit = 1 if tail_amount else max_workers
+            while not finished and len(pending) < limit:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                if tail_amount:
+                    amount = tail_amount
+                elif remaining is None:
+                    amount = BATCH_SIZE
+                elif remaining > 0:
+                    amount = min(BATCH_SIZE, remaining)
+                    remaining -= amount
+                else:
+                    break
+                pending[pool.submit(fetch, amount)] = amount
+
+        try:
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    amount = pending.pop(future)
+                    try:
+                        questions, error = future.result(), None
+                    except (RequestError, ValueError, KeyError) as e:
+                        questions, error = [], e
+
+                    if exhaustive:
+                        if error is not None:
+                            finished = True
+                        elif not questions:
+                            # Code 1: fewer than amount left (or the count index was
+                            # too high), so ask for less
+                            tail_amount = min(tail_amount or amount, amount) // 2
+                            finished = tail_amount == 0
+                    yield questions, error
+                fill()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+# Joins every text field of a payload so it is unescaped in one call; it
+# cannot appear in (or end) an HTML entity, so no entity spans two fields
+FIELD_SEPARATOR = "\x00"
+
+def decode_questions(results):
+    """Turn a raw api.php results list into Questions in one pass.
+
+    All question and answer texts are unescaped by a single html.unescape
+    call over the joined payload instead of one call per field, and each
+    distinct category name is unescaped only once.
+    """
+    texts = []
+    for q in results:
+        texts.append(q["question"])
+        texts.append(q["correct_answer"])
+        texts.extend(q["incorrect_answers"])
+
+    joined = FIELD_SEPARATOR.join(texts)
+    if joined.count(FIELD_SEPARATOR) == len(texts) - 1:
+        decoded = html.unescape(joined).split(FIELD_SEPARATOR)
+    else:
+        # A field contains the separator itself; fall back to per-field decoding
+        decoded = [html.unescape(text) for text in texts]
+
+    categories = {}
+    questions = []
+    position = 0
+    for q in results:
+        answer_count = len(q["incorrect_answers"])
+        raw_category = q.get("category", "")
+        if raw_category not in categories:
+            categories[raw_category] = html.unescape(raw_category)
+        questions.append(Question(
+            q["type"], q.get("difficulty"), categories[raw_category],
+            decoded[position], decoded[position + 1],
+            decoded[position + 2:position + 2 + answer_count]
+        ))
+        position += 2 + answer_count
+    return questions
+
+# Shared by every window so connections stay warm between quizzes
+client = OpenTDBClient()
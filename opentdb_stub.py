@@ -0,0 +1,264 @@
+"""Deterministic local stand-in for the Open Trivia Database.
+
+Serves the same endpoints and response codes as opentdb.com from a fixed,
+generated question set, including the per-IP rate limit (code 5) and
+session token errors (codes 3 and 4). Point the app at it with:
+
+    python opentdb_stub.py --port 8765
+    OPENTDB_BASE_URL=http://127.0.0.1:8765/ python main.py
+"""
+import argparse
+import collections
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+STUB_CATEGORIES = {
+    9: "General Knowledge",
+    11: "Entertainment: Film",
+    23: "History",
+}
+DIFFICULTIES = ("easy", "medium", "hard")
+TYPES = ("multiple", "boolean")
+
+def build_questions(per_combination):
+    """Generate a fixed question set: per_combination per category/type/difficulty"""
+    questions = []
+    for category_id, category in STUB_CATEGORIES.items():
+        for question_type in TYPES:
+            for difficulty in DIFFICULTIES:
+                for i in range(per_combination):
+                    key = f"{category_id}-{question_type[0]}-{difficulty[0]}-{i}"
+                    if question_type == "multiple":
+                        correct = f"Answer {key}"
+                        incorrect = [f"Wrong {key} {n}" for n in range(3)]
+                    else:
+                        correct = "True" if i % 2 else "False"
+                        incorrect = ["False" if i % 2 else "True"]
+                    questions.append({
+                        "id": len(questions),
+                        "category_id": category_id,
+                        "type": question_type,
+                        "difficulty": difficulty,
+                        "category": category,
+                        # Escaped like the real API so clients exercise html.unescape
+                        "question": html.escape(f'Stub question {key}: is this "{i}" & more?'),
+                        "correct_answer": html.escape(correct),
+                        "incorrect_answers": [html.escape(ans) for ans in incorrect],
+                    })
+    return questions
+
+# ------------------- Stub State ------------------- #
+class StubState:
+    """Questions, tokens and rate-limit bookkeeping shared by all handler threads"""
+
+    def __init__(self, per_combination=20, rate_limit=5.0, clock=time.monotonic):
+        self.questions = build_questions(per_combination)
+        self.rate_limit = rate_limit
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.last_request = {}
+        self.tokens = {}
+        self.forced_codes = collections.deque()
+        self.request_log = []
+
+    def force_codes(self, *codes):
+        """Make the next api.php requests answer with these response codes"""
+        with self.lock:
+            self.forced_codes.extend(codes)
+
+    def matching(self, params):
+        result = self.questions
+        if "category" in params:
+            result = [q for q in result if str(q["category_id"]) == params["category"]]
+        if "type" in params:
+            result = [q for q in result if q["type"] == params["type"]]
+        if "difficulty" in params:
+            result = [q for q in result if q["difficulty"] == params["difficulty"]]
+        return result
+
+    def questions_response(self, client_ip, params):
+        with self.lock:
+            self.request_log.append(("api.php", dict(params)))
+
+            now = self.clock()
+            last = self.last_request.get(client_ip)
+            if last is not None and now - last < self.rate_limit:
+                return {"response_code": 5, "results": []}
+            self.last_request[client_ip] = now
+
+            if self.forced_codes:
+                return {"response_code": self.forced_codes.popleft(), "results": []}
+
+            try:
+                amount = int(params.get("amount", ""))
+            except ValueError:
+                return {"response_code": 2, "results": []}
+            if not 1 <= amount <= 50:
+                return {"response_code": 2, "results": []}
+
+            pool = self.matching(params)
+            token = params.get("token")
+            if token is not None:
+                if token not in self.tokens:
+                    return {"response_code": 3, "results": []}
+                pool = [q for q in pool if q["id"] not in self.tokens[token]]
+                if not pool:
+                    return {"response_code": 4, "results": []}
+            if len(pool) < amount:
+                return {"response_code": 1, "results": []}
+
+            chosen = pool[:amount]
+            if token is not None:
+                self.tokens[token].update(q["id"] for q in chosen)
+            return {
+                "response_code": 0,
+                "results": [
+                    {k: q[k] for k in ("type", "difficulty", "category", "question",
+                                       "correct_answer", "incorrect_answers")}
+                    for q in chosen
+                ],
+            }
+
+    def token_response(self, params):
+        with self.lock:
+            command = params.get("command")
+            if command == "request":
+                token = f"stubtoken{len(self.tokens):04d}"
+                self.tokens[token] = set()
+                return {"response_code": 0, "response_message": "Token Generated Successfully!", "token": token}
+            if command == "reset":
+                token = params.get("token")
+                if token not in self.tokens:
+                    return {"response_code": 3, "token": ""}
+                self.tokens[token] = set()
+                return {"response_code": 0, "token": token}
+            return {"response_code": 2}
+
+    def categories_response(self):
+        return {"trivia_categories": [{"id": cid, "name": name} for cid, name in STUB_CATEGORIES.items()]}
+
+    def count_response(self, params):
+        pool = self.matching({"category": params.get("category", "")})
+        if not pool:
+            # The real API answers unknown categories with an error object
+            return {"error": "No category selected."}
+
+        counts = collections.Counter(q["difficulty"] for q in pool)
+        return {
+            "category_id": pool[0]["category_id"],
+            "category_question_count": {
+                "total_question_count": len(pool),
+                **{f"total_{d}_question_count": counts[d] for d in DIFFICULTIES},
+            },
+        }
+
+    def global_count_response(self):
+        totals = collections.Counter(q["category_id"] for q in self.questions)
+        categories = {
+            str(cid): {
+                "total_num_of_questions": n,
+                "total_num_of_pending_questions": 0,
+                "total_num_of_verified_questions": n,
+                "total_num_of_rejected_questions": 0,
+            }
+            for cid, n in totals.items()
+        }
+        overall = {
+            "total_num_of_questions": len(self.questions),
+            "total_num_of_pending_questions": 0,
+            "total_num_of_verified_questions": len(self.questions),
+            "total_num_of_rejected_questions": 0,
+        }
+        return {"overall": overall, "categories": categories}
+
+# ------------------- HTTP Server ------------------- #
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        state = self.server.state
+        endpoint = url.path.rsplit("/", 1)[-1]
+
+        if endpoint == "api.php":
+            body = state.questions_response(self.client_address[0], params)
+        elif endpoint == "api_token.php":
+            body = state.token_response(params)
+        elif endpoint == "api_category.php":
+            body = state.categories_response()
+        elif endpoint == "api_count.php":
+            body = state.count_response(params)
+        elif endpoint == "api_count_global.php":
+            body = state.global_count_response()
+        else:
+            self.send_error(404)
+            return
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+class OpenTDBStub:
+    """Run the stub server on a background thread (usable as a context manager)"""
+
+    def __init__(self, host="127.0.0.1", port=0, **state_options):
+        self.server = ThreadingHTTPServer((host, port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.state = StubState(**state_options)
+        self.thread = None
+
+    @property
+    def state(self):
+        return self.server.state
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Deterministic Open Trivia Database stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate-limit", type=float, default=5.0, help="seconds between requests per IP")
+    parser.add_argument("--per-combination", type=int, default=20,
+                        help="questions per category/type/difficulty")
+    args = parser.parse_args()
+
+    stub = OpenTDBStub(args.host, args.port, per_combination=args.per_combination, rate_limit=args.rate_limit)
+    print(f"OpenTDB stub listening on {stub.base_url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import logging
+import threading
+
+from opentdb import client
+from question_bank import open_bank
+
+logger = logging.getLogger("quizmaster.prefetch")
+
+# ------------------- Next-Round Prefetcher ------------------- #
+class QuestionPrefetcher:
+    """Tops up the local question bank for the next round in the background.
+
+    Questions land in the bank as unseen, so a following quiz with the same
+    settings is served entirely from disk. Only one prefetch runs at a time;
+    asking for different settings cancels the previous one.
+    """
+
+    def __init__(self, api_client):
+        self.client = api_client
+        self.lock = threading.Lock()
+        self.settings = None
+        self.cancel_event = threading.Event()
+        self.thread = None
+
+    def prefetch(self, category_id, question_type, count):
+        """Make sure count unseen questions for these settings will be in the bank"""
+        settings = (category_id, question_type, count)
+        with self.lock:
+            if settings == self.settings and self.thread and self.thread.is_alive():
+                return
+            self.cancel_event.set()
+            self.cancel_event = threading.Event()
+            self.settings = settings
+            self.thread = threading.Thread(
+                target=self.run, args=(settings, self.cancel_event), daemon=True
+            )
+            self.thread.start()
+
+    def invalidate(self):
+        """Cancel any pending prefetch"""
+        with self.lock:
+            self.cancel_event.set()
+            self.settings = None
+
+    def invalidate_if_changed(self, category_id, question_type, count):
+        """Cancel the pending prefetch unless it is for exactly these settings"""
+        if self.settings != (category_id, question_type, count):
+            self.invalidate()
+
+    def run(self, settings, cancel_event):
+        category_id, question_type, count = settings
+        bank = open_bank()
+        if bank is None:
+            return
+
+        try:
+            if count is None:
+                # Whole-category quizzes always fetch live
+                return
+            missing = count - bank.count(category_id, question_type)
+            if missing <= 0 or cancel_event.is_set():
+                return
+
+            added = 0
+            batches = self.client.question_batches(
+                missing, category_id, question_type, cancel_event=cancel_event
+            )
+            try:
+                for questions, error in batches:
+                    if cancel_event.is_set():
+                        return
+                    if error is not None:
+                        logger.info("Prefetch batch for %s failed: %s", settings, error)
+                        continue
+                    bank.add_questions(category_id, questions)
+                    added += len(questions)
+            finally:
+                batches.close()
+            logger.info("Prefetched %d questions for %s", added, settings)
+        finally:
+            bank.close()
+
+# Shared by every window so the prefetch survives moving between screens
+prefetcher = QuestionPrefetcher(client)
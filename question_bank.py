@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from question_model import Question
+from storage import data_dir
+
+BANK_FILE = "questions.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    content_hash TEXT PRIMARY KEY,
+    category_id INTEGER NOT NULL,
+    category TEXT,
+    type TEXT NOT NULL,
+    difficulty TEXT,
+    question TEXT NOT NULL,
+    correct_answer TEXT NOT NULL,
+    incorrect_answers TEXT NOT NULL,
+    times_served INTEGER NOT NULL DEFAULT 0,
+    last_served REAL,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_questions_lookup
+    ON questions (category_id, type, difficulty, times_served);
+"""
+
+# Keyword index over question and answer text. It keeps its own copy of the
+# text, keyed by content hash, so it never depends on rowids staying stable.
+# The type is an indexed column so filtering by it stays inside the index
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE questions_fts USING fts5(
+    content_hash UNINDEXED, kind, question, answers,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER questions_fts_insert AFTER INSERT ON questions BEGIN
+    INSERT INTO questions_fts (content_hash, kind, question, answers)
+    VALUES (new.content_hash, new.type, new.question,
+            new.correct_answer || ' ' || new.incorrect_answers);
+END;
+CREATE TRIGGER questions_fts_delete AFTER DELETE ON questions BEGIN
+    DELETE FROM questions_fts WHERE content_hash = old.content_hash;
+END;
+INSERT INTO questions_fts (content_hash, kind, question, answers)
+    SELECT content_hash, type, question, correct_answer || ' ' || incorrect_answers FROM questions;
+"""
+
+QUESTION_COLUMNS = "content_hash, category_id, category, type, difficulty, question, correct_answer, incorrect_answers"
+SEARCH_WORD = re.compile(r"\w+")
+
+def content_hash(question):
+    """Stable identity for a question, independent of answer order"""
+    parts = [question.type, question.text, question.correct_answer]
+    parts.extend(sorted(question.incorrect_answers))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+# ------------------- Local Question Bank ------------------- #
+class QuestionBank:
+    """SQLite store of every question the app has fetched, deduplicated by content"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(data_dir(), BANK_FILE)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            self.has_fts = self.create_search_index()
+
+    def create_search_index(self):
+        """Create and backfill the FTS5 index once; False if SQLite lacks FTS5"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'questions_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            self.conn.executescript("BEGIN;" + FTS_SCHEMA + "COMMIT;")
+        except sqlite3.OperationalError:
+            self.conn.rollback()
+            return False
+        return True
+
+    def close(self):
+        self.conn.close()
+
+    def add_questions(self, category_id, questions):
+        """Store Questions, filling in their content hashes, and return the hashes"""
+        now = time.time()
+        hashes = []
+        rows = []
+        for question in questions:
+            if question.content_hash is None:
+                question.content_hash = content_hash(question)
+            hashes.append(question.content_hash)
+            rows.append((
+                question.content_hash, category_id, question.category, question.type,
+                question.difficulty, question.text, question.correct_answer,
+                json.dumps(question.incorrect_answers), now
+            ))
+
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO questions "
+                "(content_hash, category_id, category, type, difficulty, question, "
+                "correct_answer, incorrect_answers, added_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return hashes
+
+    def draw(self, category_id, question_type, count, difficulty=None, unseen_only=True):
+        """Take up to count questions, least-served first, and mark them as served"""
+        query = f"SELECT {QUESTION_COLUMNS} FROM questions WHERE category_id = ? AND type = ?"
+        params = [category_id, question_type]
+        if difficulty:
+            query += " AND difficulty = ?"
+            params.append(difficulty)
+        if unseen_only:
+            query += " AND times_served = 0"
+        query += " ORDER BY times_served, last_served, RANDOM() LIMIT ?"
+        params.append(count)
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        questions = [self.row_to_question(row) for row in rows]
+        self.mark_served([question.content_hash for question in questions])
+        return questions
+
+    def count(self, category_id, question_type, difficulty=None, unseen_only=True):
+        """Number of stored questions matching the given settings"""
+        query = "SELECT COUNT(*) FROM questions WHERE category_id = ? AND type = ?"
+        params = [category_id, question_type]
+        if difficulty:
+            query += " AND difficulty = ?"
+            params.append(difficulty)
+        if unseen_only:
+            query += " AND times_served = 0"
+
+        with self.lock:
+            return self.conn.execute(query, params).fetchone()[0]
+
+    def get_question(self, digest):
+        """The stored Question with this content hash, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {QUESTION_COLUMNS} FROM questions WHERE content_hash = ?", (digest,)
+            ).fetchone()
+        return self.row_to_question(row) if row else None
+
+    def review_candidates(self, category_id, question_type):
+        """(content_hash, difficulty) of every stored question for these settings"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT content_hash, difficulty FROM questions WHERE category_id = ? AND type = ?",
+                (category_id, question_type)
+            ).fetchall()
+
+    def total(self):
+        """Number of stored questions across every category"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def iter_questions(self, category_id=None, chunk_size=1000):
+        """Stream (category_id, Question) pairs, fetching chunk_size rows at a time"""
+        query = f"SELECT {QUESTION_COLUMNS} FROM questions"
+        params = []
+        if category_id is not None:
+            query += " WHERE category_id = ?"
+            params.append(category_id)
+        query += " ORDER BY category_id, type, rowid"
+
+        with self.lock:
+            cursor = self.conn.execute(query, params)
+        while True:
+            with self.lock:
+                rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            for row in rows:
+                yield row["category_id"], self.row_to_question(row)
+
+    def search_matches(self, text, question_type):
+        """SQL and parameters selecting the rowids of every match for text.
+
+        Every word of text must appear (as a prefix) in the question or its
+        answers. Only index rowids are selected, so counting or sampling a
+        broad match never reads the stored text of each matching row.
+        """
+        words = SEARCH_WORD.findall(text.lower())
+        if not words:
+            return None, None
+
+        if self.has_fts:
+            match = "{question answers} : (" + " ".join(f'"{word}"*' for word in words) + ")"
+            if question_type:
+                match = f'kind : "{question_type}" AND {match}'
+            return "SELECT rowid FROM questions_fts WHERE questions_fts MATCH ?", [match]
+
+        # Without FTS5 fall back to a (slow) scan of the same text
+        query = "SELECT rowid FROM questions WHERE 1"
+        params = []
+        for word in words:
+            query += " AND (question || ' ' || correct_answer || ' ' || incorrect_answers) LIKE ?"
+            params.append(f"%{word}%")
+        if question_type:
+            query += " AND type = ?"
+            params.append(question_type)
+        return query, params
+
+    def search(self, text, question_type=None, limit=-1):
+        """Up to limit random questions mentioning every word of text, marked as served.
+
+        Matches are sampled rather than ranked: each one contains every word,
+        and ranking a broad query costs more than the rest of the search.
+        """
+        matches, params = self.search_matches(text, question_type)
+        if matches is None:
+            return []
+        columns = ", ".join(f"q.{column}" for column in QUESTION_COLUMNS.split(", "))
+        source = "questions_fts" if self.has_fts else "questions"
+        query = (f"SELECT {columns} FROM {source} AS m JOIN questions AS q USING (content_hash) "
+                 f"WHERE m.rowid IN ({matches} ORDER BY RANDOM() LIMIT ?)")
+        params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        questions = [self.row_to_question(row) for row in rows]
+        self.mark_served([question.content_hash for question in questions])
+        return questions
+
+    def search_count(self, text, question_type=None, cap=-1):
+        """Number of questions search() can draw from, counting no further than cap"""
+        matches, params = self.search_matches(text, question_type)
+        if matches is None:
+            return 0
+        with self.lock:
+            return self.conn.execute(
+                f"SELECT COUNT(*) FROM ({matches} LIMIT ?)", params + [cap]
+            ).fetchone()[0]
+
+    def mark_served(self, hashes):
+        """Record that the given questions have been shown in a quiz"""
+        if not hashes:
+            return
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE questions SET times_served = times_served + 1, last_served = ? "
+                "WHERE content_hash = ?",
+                [(now, digest) for digest in hashes]
+            )
+
+    @staticmethod
+    def row_to_question(row):
+        return Question(
+            row["type"], row["difficulty"], row["category"], row["question"],
+            row["correct_answer"], json.loads(row["incorrect_answers"]), row["content_hash"]
+        )
+
+def open_bank():
+    """Open the local question bank, or return None if it is unavailable"""
+    try:
+        return QuestionBank()
+    except (sqlite3.Error, OSError):
+        return None
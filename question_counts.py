@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import metrics
+from opentdb import RequestError, client
+from storage import read_json_cache, write_json_cache
+
+COUNT_CACHE_FILE = "question_counts.json"
+COUNT_CACHE_TTL = 24 * 60 * 60  # The question pool changes slowly; refresh daily
+COUNT_FETCH_WORKERS = 6
+
+# ------------------- Question Count Index ------------------- #
+class QuestionCountIndex:
+    """How many questions the API has per category and difficulty.
+
+    Built from api_count_global.php and api_count.php and cached on disk, so
+    the settings screen can rule out impossible quizzes without a request.
+    The API does not break counts down by question type, so these are upper
+    bounds for either type.
+    """
+
+    def __init__(self, counts=None):
+        # {category_id: {"total": n, "easy": n, "medium": n, "hard": n}};
+        # difficulty keys are missing when only the global total is known
+        self.counts = counts or {}
+
+    def available(self, category_id, difficulty=None):
+        """Questions available for a category, or None if it is not indexed"""
+        counts = self.counts.get(category_id)
+        if counts is None:
+            return None
+        return counts.get(difficulty or "total")
+
+    def available_across(self, category_ids, difficulty=None):
+        """Questions available over several categories, or None if any is not indexed"""
+        counts = [self.available(cid, difficulty) for cid in category_ids]
+        if not counts or None in counts:
+            return None
+        return sum(counts)
+
+    def to_json(self):
+        return {str(cid): counts for cid, counts in self.counts.items()}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls({int(cid): counts for cid, counts in data.items()})
+
+def load_question_counts():
+    """Return (index, needs_refresh) without touching the network"""
+    cached, is_fresh = read_json_cache(COUNT_CACHE_FILE, COUNT_CACHE_TTL)
+    if cached:
+        try:
+            index = QuestionCountIndex.from_json(cached)
+        except (AttributeError, TypeError, ValueError):
+            pass
+        else:
+            metrics.incr("cache_hits", cache="question_counts")
+            return index, not is_fresh
+    metrics.incr("cache_misses", cache="question_counts")
+    return QuestionCountIndex(), True
+
+def fetch_question_counts(category_ids, api_client=client, max_workers=COUNT_FETCH_WORKERS):
+    """Download counts for every category concurrently (raises opentdb.RequestError).
+
+    The global totals and each category's difficulty breakdown are requested
+    in parallel. A category whose own request fails keeps its global total.
+    """
+    counts = {}
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="opentdb-count") as pool:
+        global_future = pool.submit(api_client.global_counts)
+        futures = {pool.submit(api_client.category_counts, cid): cid for cid in category_ids}
+
+        for future in as_completed(futures):
+            try:
+                counts[futures[future]] = future.result()
+            except RequestError:
+                pass
+
+        try:
+            totals = global_future.result()
+        except RequestError:
+            if not counts:
+                raise
+            totals = {}
+
+    for cid, total in totals.items():
+        counts.setdefault(cid, {"total": total})
+    return QuestionCountIndex(counts)
+
+def refresh_question_counts(category_ids):
+    """Rebuild the index and update the on-disk cache, or return None on failure"""
+    try:
+        with metrics.span("count_fetch"):
+            index = fetch_question_counts(category_ids)
+    except RequestError:
+        return None
+    write_json_cache(COUNT_CACHE_FILE, index.to_json())
+    return index
@@ -0,0 +1,30 @@
+import sys
+
+# ------------------- Question Model ------------------- #
+class Question:
+    """One decoded trivia question.
+
+    Uses __slots__ and interns the small set of category, type and
+    difficulty strings, so a bank of 100k questions stays compact: every
+    question of a category shares one category string.
+    """
+    __slots__ = ("type", "difficulty", "category", "text", "correct_answer",
+                 "incorrect_answers", "content_hash")
+
+    def __init__(self, type, difficulty, category, text, correct_answer, incorrect_answers,
+                 content_hash=None):
+        self.type = sys.intern(type)
+        self.difficulty = sys.intern(difficulty) if difficulty else None
+        self.category = sys.intern(category) if category else None
+        self.text = text
+        self.correct_answer = correct_answer
+        self.incorrect_answers = tuple(incorrect_answers)
+        self.content_hash = content_hash
+
+    def __repr__(self):
+        return f"Question({self.type!r}, {self.category!r}, {self.text!r})"
+
+    @property
+    def answers(self):
+        """Every answer option, correct one last"""
+        return list(self.incorrect_answers) + [self.correct_answer]
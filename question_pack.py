@@ -0,0 +1,339 @@
+"""Offline question packs: gzip-compressed JSON lines with a header index.
+
+A pack is a series of independent gzip members. The first holds a single
+JSON header line with the pack's categories and a block index; each of the
+others holds a block of up to BLOCK_RECORDS question lines. Concatenated
+gzip members are themselves a valid gzip stream, so ``zcat pack.qpack.gz``
+prints the header followed by every question, but a reader that knows the
+index can seek straight to the few blocks it needs.
+
+    python question_pack.py export general.qpack.gz --category 9 --name "General"
+    python question_pack.py import general.qpack.gz
+    python question_pack.py info general.qpack.gz
+
+Packs placed in the packs/ folder of the data directory are offered as a
+question source on the settings screen.
+"""
+import argparse
+import collections
+import glob
+import gzip
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import zlib
+
+from question_bank import open_bank
+from question_counts import QuestionCountIndex
+from question_model import Question
+from storage import data_dir
+
+PACK_FORMAT = "quizmaster-pack"
+PACK_VERSION = 1
+PACK_SUFFIX = ".qpack.gz"
+PACK_DIR = "packs"
+BLOCK_RECORDS = 1000  # Questions per gzip member; the unit of random access
+READ_CHUNK = 64 * 1024
+IMPORT_BATCH = 500
+# Header entries every reader relies on, and their types
+HEADER_FIELDS = {"count": int, "categories": dict, "blocks": list}
+BLOCK_FIELDS = ("offset", "length", "groups")
+
+class PackError(Exception):
+    """A file that is not a readable question pack"""
+
+def group_key(category_id, question_type):
+    return f"{category_id}:{question_type}"
+
+def question_to_dict(category_id, question):
+    return {
+        "category_id": category_id,
+        "category": question.category,
+        "type": question.type,
+        "difficulty": question.difficulty,
+        "question": question.text,
+        "correct_answer": question.correct_answer,
+        "incorrect_answers": question.incorrect_answers,
+    }
+
+def dict_to_question(data):
+    """Parse one question record into (category_id, Question)"""
+    try:
+        return data["category_id"], Question(
+            data["type"], data.get("difficulty"), data.get("category"), data["question"],
+            data["correct_answer"], data["incorrect_answers"]
+        )
+    except (KeyError, TypeError) as e:
+        raise PackError(f"Malformed question record: {e}")
+
+def question_to_line(category_id, question):
+    return json.dumps(question_to_dict(category_id, question), ensure_ascii=False).encode("utf-8") + b"\n"
+
+def line_to_question(line):
+    """Parse one question line into (category_id, Question)"""
+    try:
+        data = json.loads(line)
+    except ValueError as e:
+        raise PackError(f"Malformed question line: {e}")
+    return dict_to_question(data)
+
+# ------------------- Writing ------------------- #
+def write_pack(path, items, name=None, block_records=BLOCK_RECORDS):
+    """Stream (category_id, Question) pairs into a pack and return its size in questions.
+
+    Blocks are compressed to a temporary file as they fill up, so memory use
+    is bounded by one block however many questions are written. The header
+    goes first once the block offsets are known.
+    """
+    categories = {}
+    blocks = []
+    lines = []
+    groups = collections.Counter()
+
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryFile(dir=directory) as body:
+        def flush():
+            offset = body.tell()
+            body.write(gzip.compress(b"".join(lines), mtime=0))
+            blocks.append({
+                "offset": offset, "length": body.tell() - offset,
+                "count": len(lines), "groups": dict(groups),
+            })
+            lines.clear()
+            groups.clear()
+
+        for category_id, question in items:
+            lines.append(question_to_line(category_id, question))
+            groups[group_key(category_id, question.type)] += 1
+            if question.category:
+                categories[str(category_id)] = question.category
+            if len(lines) >= block_records:
+                flush()
+        if lines:
+            flush()
+
+        header = {
+            "format": PACK_FORMAT,
+            "version": PACK_VERSION,
+            "name": name or os.path.basename(path).split(".")[0],
+            "count": sum(block["count"] for block in blocks),
+            "categories": categories,
+            "blocks": blocks,
+        }
+
+        # Write next to the target and swap it in, so a reader never sees half a pack
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".pack.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(json.dumps(header).encode("utf-8") + b"\n", mtime=0))
+                body.seek(0)
+                shutil.copyfileobj(body, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    return header["count"]
+
+# ------------------- Reading ------------------- #
+def read_header(f):
+    """Decompress only the first gzip member; return (header, offset of the first block)"""
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    data = b""
+    consumed = 0
+    try:
+        while not decompressor.eof:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                raise PackError("Truncated pack header")
+            consumed += len(chunk)
+            data += decompressor.decompress(chunk)
+        header = json.loads(data)
+    except (zlib.error, ValueError) as e:
+        raise PackError(f"Not a question pack: {e}")
+
+    if not isinstance(header, dict) or header.get("format") != PACK_FORMAT:
+        raise PackError("Not a question pack")
+    if header.get("version") != PACK_VERSION:
+        raise PackError(f"Unsupported pack version {header.get('version')}")
+    for key, kind in HEADER_FIELDS.items():
+        if not isinstance(header.get(key), kind):
+            raise PackError(f"Malformed pack header: missing or invalid {key!r}")
+    for block in header["blocks"]:
+        if not isinstance(block, dict) or not all(key in block for key in BLOCK_FIELDS):
+            raise PackError("Malformed pack header: invalid block entry")
+    return header, consumed - len(decompressor.unused_data)
+
+class QuestionPack:
+    """Indexed read access to a pack file; only the header is read up front"""
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, "rb") as f:
+                self.header, self.data_start = read_header(f)
+        except OSError as e:
+            raise PackError(f"Cannot open pack: {e}")
+        self.name = self.header.get("name") or os.path.basename(path)
+        self.blocks = self.header["blocks"]
+        try:
+            self.categories = {int(cid): name for cid, name in self.header["categories"].items()}
+        except ValueError as e:
+            raise PackError(f"Malformed pack header: {e}")
+
+    def __len__(self):
+        return self.header["count"]
+
+    def category_map(self):
+        """The pack's categories as {name: id}, like the OpenTDB category list"""
+        return {name: cid for cid, name in self.categories.items()}
+
+    def available(self, category_id, question_type):
+        key = group_key(category_id, question_type)
+        return sum(block["groups"].get(key, 0) for block in self.blocks)
+
+    def count_index(self, question_type):
+        """A QuestionCountIndex over the pack's questions of one type, for validating quiz settings"""
+        return QuestionCountIndex({
+            cid: {"total": self.available(cid, question_type)} for cid in self.categories
+        })
+
+    def read_block(self, f, block):
+        f.seek(self.data_start + block["offset"])
+        try:
+            return gzip.decompress(f.read(block["length"])).splitlines()
+        except (OSError, EOFError, zlib.error) as e:
+            raise PackError(f"Corrupt pack block: {e}")
+
+    def iter_questions(self):
+        """Stream every (category_id, Question), one block in memory at a time"""
+        with open(self.path, "rb") as f:
+            for block in self.blocks:
+                for line in self.read_block(f, block):
+                    yield line_to_question(line)
+
+    def sample(self, category_id, question_type, count=None, rng=None):
+        """Pick count random matching Questions (all of them if count is None).
+
+        The block index says how many matching questions each block holds,
+        so positions are chosen first and only the blocks containing them
+        are decompressed.
+        """
+        rng = rng or random.Random()
+        key = group_key(category_id, question_type)
+        matching = [(block, block["groups"].get(key, 0)) for block in self.blocks]
+        total = sum(n for _, n in matching)
+        positions = sorted(rng.sample(range(total), total if count is None else min(count, total)))
+
+        wanted = collections.defaultdict(set)
+        start = 0
+        block_iter = iter(matching)
+        block, n = next(block_iter, (None, 0))
+        for position in positions:
+            while position >= start + n:
+                start += n
+                block, n = next(block_iter)
+            wanted[id(block)].add(position - start)
+
+        questions = []
+        with open(self.path, "rb") as f:
+            for block, _ in matching:
+                picks = wanted.get(id(block))
+                if not picks:
+                    continue
+                index = 0
+                for line in self.read_block(f, block):
+                    cid, question = line_to_question(line)
+                    if cid != category_id or question.type != question_type:
+                        continue
+                    if index in picks:
+                        questions.append(question)
+                    index += 1
+        rng.shuffle(questions)
+        return questions
+
+def pack_dir():
+    path = os.path.join(data_dir(), PACK_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def find_packs():
+    """Return {pack name: path} for every readable pack in the packs folder"""
+    packs = {}
+    for path in sorted(glob.glob(os.path.join(pack_dir(), "*" + PACK_SUFFIX))):
+        try:
+            packs[QuestionPack(path).name] = path
+        except PackError:
+            continue
+    return packs
+
+# ------------------- Command Line ------------------- #
+def import_pack(path):
+    """Stream a pack into the local question bank and return the number of new questions"""
+    pack = QuestionPack(path)
+    bank = open_bank()
+    if bank is None:
+        raise PackError("The local question bank is unavailable")
+
+    before = bank.total()
+    batch = collections.defaultdict(list)
+    try:
+        for i, (category_id, question) in enumerate(pack.iter_questions(), 1):
+            batch[category_id].append(question)
+            if i % IMPORT_BATCH == 0:
+                for cid, questions in batch.items():
+                    bank.add_questions(cid, questions)
+                batch.clear()
+        for cid, questions in batch.items():
+            bank.add_questions(cid, questions)
+        return bank.total() - before
+    finally:
+        bank.close()
+
+def export_pack(path, category_id=None, name=None):
+    """Write the local question bank (or one category of it) to a pack"""
+    bank = open_bank()
+    if bank is None:
+        raise PackError("The local question bank is unavailable")
+    try:
+        return write_pack(path, bank.iter_questions(category_id), name=name)
+    finally:
+        bank.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Import, export and inspect question packs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="write the local question bank to a pack")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--category", type=int, help="only this OpenTDB category id")
+    export_parser.add_argument("--name", help="name shown on the settings screen")
+
+    import_parser = commands.add_parser("import", help="add a pack's questions to the local bank")
+    import_parser.add_argument("path")
+
+    info_parser = commands.add_parser("info", help="show a pack's header")
+    info_parser.add_argument("path")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "export":
+            count = export_pack(args.path, args.category, args.name)
+            print(f"Exported {count} questions to {args.path}")
+        elif args.command == "import":
+            added = import_pack(args.path)
+            print(f"Imported {added} new questions from {args.path}")
+        else:
+            pack = QuestionPack(args.path)
+            print(f"{pack.name}: {len(pack)} questions in {len(pack.blocks)} blocks")
+            for cid, category in sorted(pack.categories.items()):
+                counts = ", ".join(f"{t} {pack.available(cid, t)}" for t in ("multiple", "boolean"))
+                print(f"  {cid:>4}  {category} ({counts})")
+    except (PackError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
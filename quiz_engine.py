@@ -0,0 +1,413 @@
+import collections
+import queue
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from opentdb import OpenTDBError, RequestError, client
+from question_bank import content_hash, open_bank
+from question_counts import load_question_counts
+from question_pack import PackError, QuestionPack
+
+# Result bands as (minimum percentage, band, message); the band doubles as
+# the dialog type the GUI uses to pick colors
+RESULT_BANDS = [
+    (80, "success", "Outstanding! 🏆"),
+    (60, "info", "Good job! 👍"),
+    (40, "warning", "Keep learning! 📚"),
+    (0, "error", "Try again! 💪"),
+]
+
+QuizResult = collections.namedtuple("QuizResult", "score total percentage band message")
+
+def result_band(percentage):
+    """Return (band, message) for a score percentage"""
+    for minimum, band, message in RESULT_BANDS:
+        if percentage >= minimum:
+            return band, message
+    return RESULT_BANDS[-1][1:]
+
+# ------------------- Quiz Engine ------------------- #
+class QuizEngine:
+    """Tk-free quiz state: questions, answer checking, scoring and results.
+
+    Questions are question_model.Question objects, each with its answer
+    options in display order alongside. They can keep arriving while the
+    quiz is played; the quiz only completes once finish_loading() has been
+    called and every question has been answered. In review mode they are
+    instead drawn one at a time from a review.ReviewScheduler, which is told
+    about each answer so it can reschedule the question.
+    """
+
+    def __init__(self, expected_count=0, rng=None):
+        # None means the size is not known until loading finishes
+        self.expected_count = expected_count or 0
+        self.rng = rng or random.Random()
+        self.questions = []
+        self.choices = []
+        self.answers = []
+        self.current_index = 0
+        self.score = 0
+        self.loading = True
+        self.scheduler = None
+        self.stopped = False
+
+    def add_question(self, question):
+        """Add a Question, shuffling multiple choice answers"""
+        if question.type == "multiple":
+            choices = question.answers
+            self.rng.shuffle(choices)
+        else:
+            choices = ["True", "False"]
+        self.questions.append(question)
+        self.choices.append(choices)
+
+    def use_scheduler(self, scheduler):
+        """Draw the quiz's questions from a review scheduler, one per turn"""
+        self.scheduler = scheduler
+        # Never ask for more questions than the scheduler holds
+        if not self.expected_count or self.expected_count > len(scheduler):
+            self.expected_count = len(scheduler)
+        self.draw_scheduled()
+
+    def draw_scheduled(self):
+        question = self.scheduler.next_question()
+        if question is not None:
+            self.add_question(question)
+        if question is None or len(self.questions) >= self.expected_count:
+            self.finish_loading()
+
+    def finish_loading(self):
+        self.loading = False
+
+    @property
+    def total(self):
+        """Number of questions in the quiz, counting ones still loading"""
+        if self.loading:
+            return max(self.expected_count, len(self.questions))
+        return len(self.questions)
+
+    def current_question(self):
+        """The Question to show now, or None if it has not been loaded yet"""
+        if self.current_index < len(self.questions):
+            return self.questions[self.current_index]
+        return None
+
+    def current_choices(self):
+        """Answer options for the current question, in display order"""
+        return self.choices[self.current_index]
+
+    def is_waiting(self):
+        """True when the player is ahead of the loader"""
+        return self.loading and self.current_index >= len(self.questions)
+
+    def is_complete(self):
+        return not self.loading and self.current_index >= len(self.questions)
+
+    def answer(self, user_answer):
+        """Check an answer to the current question and return (is_correct, correct_answer)"""
+        question = self.questions[self.current_index]
+        correct_answer = question.correct_answer
+        is_correct = user_answer == correct_answer
+        if is_correct:
+            self.score += 1
+        if self.scheduler:
+            self.scheduler.record(question, is_correct)
+        self.answers.append((self.current_index, user_answer, is_correct))
+        return is_correct, correct_answer
+
+    def time_out(self):
+        """Count the current question as missed because its time ran out"""
+        return self.answer(None)
+
+    def stop(self):
+        """End the quiz early (the quiz time ran out); unasked questions count as misses"""
+        self.stopped = True
+        self.loading = False
+        self.current_index = len(self.questions)
+
+    def advance(self):
+        self.current_index += 1
+        if self.scheduler and self.loading:
+            self.draw_scheduled()
+
+    def result(self):
+        """Final score, percentage and performance band"""
+        total = len(self.questions)
+        if self.stopped:
+            total = max(total, self.expected_count)
+        percentage = (self.score / total) * 100 if total else 0.0
+        band, message = result_band(percentage)
+        return QuizResult(self.score, total, percentage, band, message)
+
+# ------------------- Question Loading ------------------- #
+def describe_error(error):
+    """Title and message to show for a failed question request"""
+    if isinstance(error, OpenTDBError):
+        return ("API Error", str(error))
+    return ("Connection Error", "Failed to fetch questions. Please check your internet connection.")
+
+def load_questions(category_id, question_type, count, emit, cancel_event=None, on_wait=None):
+    """Serve questions from the local bank, topping up from the API.
+
+    Calls emit(question) for each Question as soon as it is available, so a
+    large quiz can start while later API batches are still downloading.
+    count=None loads the whole category, including questions played in
+    earlier rounds. Returns None on success or a
+    (title, message) pair if no questions could be loaded. Blocks on the
+    network, so call it from a worker thread.
+    """
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    served = set()
+
+    def serve(question):
+        """Emit a question unless it is a duplicate or the quiz is full"""
+        if question.content_hash is None:
+            question.content_hash = content_hash(question)
+        if question.content_hash in served or (count is not None and len(served) >= count):
+            return False
+        served.add(question.content_hash)
+        emit(question)
+        return True
+
+    bank = open_bank()
+    if bank:
+        if count is None:
+            stored = bank.draw(category_id, question_type, -1, unseen_only=False)
+        else:
+            stored = bank.draw(category_id, question_type, count)
+        for question in stored:
+            serve(question)
+        metrics.incr("questions_served", len(served), source="bank")
+
+    missing = None if count is None else count - len(served)
+    error = None
+
+    if (missing is None or missing > 0) and not cancelled():
+        downloaded = 0
+        # The count index knows a category's size across both question types,
+        # so a marathon fetches every type in exactly sized batches and keeps
+        # the ones asked for; the rest still go into the bank
+        fetch_type, total = question_type, None
+        if count is None:
+            total = load_question_counts()[0].available(category_id)
+            if total is None:
+                # Not indexed yet; api_count.php is not rate limited
+                try:
+                    total = client.category_counts(category_id)["total"]
+                except RequestError:
+                    pass
+            if total is not None:
+                fetch_type = None
+        batches = client.question_batches(
+            missing, category_id, fetch_type, on_wait=on_wait, cancel_event=cancel_event, total=total
+        )
+        try:
+            for questions, batch_error in batches:
+                if cancelled():
+                    break
+                if batch_error is not None:
+                    error = error or describe_error(batch_error)
+                    continue
+
+                if questions and bank:
+                    hashes = bank.add_questions(category_id, questions)
+                    bank.mark_served([
+                        digest for digest, question in zip(hashes, questions)
+                        if question.type == question_type
+                    ])
+
+                new_questions = sum(
+                    serve(question) for question in questions if question.type == question_type
+                )
+                metrics.incr("questions_served", new_questions, source="api")
+                downloaded += len(questions)
+        finally:
+            batches.close()
+
+        if not downloaded:
+            error = error or ("API Error", "No questions found for these settings.")
+            if bank:
+                # Offline: fall back to questions that have been played before
+                fallback_count = -1 if count is None else missing + len(served)
+                replayed = sum(
+                    serve(question)
+                    for question in bank.draw(category_id, question_type, fallback_count, unseen_only=False)
+                )
+                metrics.incr("questions_served", replayed, source="offline")
+
+    if bank:
+        bank.close()
+
+    return error if not served else None
+
+def load_pack_questions(pack_path, category_id, question_type, count, emit):
+    """Serve questions from an offline question pack instead of the API.
+
+    Only the pack blocks holding the sampled questions are decompressed, so
+    a short quiz from a huge pack reads a few blocks. Returns None or a
+    (title, message) pair, like load_questions().
+    """
+    try:
+        questions = QuestionPack(pack_path).sample(category_id, question_type, count)
+    except PackError as e:
+        return ("Pack Error", str(e))
+    if not questions:
+        return ("Pack Error", "This pack has no questions for these settings.")
+
+    for question in questions:
+        emit(question)
+    metrics.incr("questions_served", len(questions), source="pack")
+    return None
+
+# ------------------- Mixed Quizzes ------------------- #
+MAX_PARALLEL_CATEGORIES = 4  # Categories loaded at once; API calls still queue on the rate limit
+MIX_LEAD = 2  # Questions one category may run ahead of another that is still loading
+
+def split_count(count, parts):
+    """Share count questions as evenly as possible, earlier parts taking the remainder"""
+    share, extra = divmod(count, parts)
+    return [share + (i < extra) for i in range(parts)]
+
+class CategoryMixer:
+    """Interleaves questions from several categories as they arrive.
+
+    A question is passed on as soon as its category is not more than
+    MIX_LEAD questions ahead of any category still loading, so the quiz
+    starts on the first arrival and stays balanced; once a category has
+    finished loading it no longer holds the others back.
+    """
+
+    def __init__(self, category_ids, count, emit):
+        self.count = count
+        self.emit = emit
+        self.pending = {cid: collections.deque() for cid in category_ids}
+        self.emitted = dict.fromkeys(category_ids, 0)
+        self.received = dict.fromkeys(category_ids, 0)
+        self.loading = collections.Counter()
+        self.seen = set()
+        self.total = 0
+
+    def start(self, category_id):
+        self.loading[category_id] += 1
+
+    def add(self, category_id, question):
+        if question.content_hash is None:
+            question.content_hash = content_hash(question)
+        if question.content_hash in self.seen:
+            return
+        self.seen.add(question.content_hash)
+        self.received[category_id] += 1
+        self.pending[category_id].append(question)
+        self.release()
+
+    def finish(self, category_id):
+        self.loading[category_id] -= 1
+        self.release()
+
+    def is_full(self):
+        return self.count is not None and self.total >= self.count
+
+    def release(self):
+        while not self.is_full():
+            ready = [cid for cid, questions in self.pending.items() if questions]
+            if not ready:
+                return
+            category_id = min(ready, key=lambda cid: self.emitted[cid])
+            waiting_on = [
+                self.emitted[cid] for cid, loaders in self.loading.items()
+                if loaders and not self.pending[cid]
+            ]
+            if waiting_on and self.emitted[category_id] >= min(waiting_on) + MIX_LEAD:
+                return
+            self.emit(self.pending[category_id].popleft())
+            self.emitted[category_id] += 1
+            self.total += 1
+
+def load_mixed_questions(category_ids, count, load, emit, cancel_event=None,
+                         max_workers=MAX_PARALLEL_CATEGORIES):
+    """Build one interleaved quiz from several categories, loaded concurrently.
+
+    load(category_id, count, emit) loads one category's share and returns
+    None or a (title, message) pair - load_questions() or
+    load_pack_questions() with the other settings bound. Each category gets
+    an equal share of count (all its questions when count is None); if some
+    come up short, the categories that filled their share are asked once
+    more for the difference. Returns None or the first error if no
+    questions could be loaded at all.
+    """
+    arrivals = queue.Queue()
+    mixer = CategoryMixer(category_ids, count, emit)
+    errors = []
+
+    def fetch(category_id, share):
+        try:
+            error = load(category_id, share, lambda question: arrivals.put((category_id, question)))
+        except Exception as e:
+            # Never leave drain() waiting on a worker that died
+            error = describe_error(e)
+        arrivals.put((category_id, error or False))
+
+    def drain(outstanding):
+        while outstanding:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            try:
+                category_id, item = arrivals.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is False or isinstance(item, tuple):
+                if item:
+                    errors.append(item)
+                outstanding -= 1
+                mixer.finish(category_id)
+            else:
+                mixer.add(category_id, item)
+
+    shares = [None] * len(category_ids) if count is None else split_count(count, len(category_ids))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for category_id, share in zip(category_ids, shares):
+            mixer.start(category_id)
+            pool.submit(fetch, category_id, share)
+        drain(len(category_ids))
+
+        # Marathon quizzes (count None) already asked every category for everything
+        missing = 0 if count is None else count - mixer.total
+        fillers = []
+        if missing > 0:
+            fillers = [cid for cid, share in zip(category_ids, shares) if mixer.received[cid] >= share]
+        if fillers and not (cancel_event is not None and cancel_event.is_set()):
+            # Top up from the categories that had questions to spare
+            for category_id, share in zip(fillers, split_count(missing, len(fillers))):
+                if share:
+                    mixer.start(category_id)
+                    pool.submit(fetch, category_id, share)
+            drain(min(missing, len(fillers)))
+
+    if not mixer.total:
+        return errors[0] if errors else ("Error", "No questions found for these settings.")
+    return None
+
+def load_search_questions(text, question_type, count, emit):
+    """Build a quiz from saved questions matching a keyword search.
+
+    Searches the local bank's full-text index only, so it never touches the
+    network. Returns None or a (title, message) pair, like load_questions().
+    """
+    bank = open_bank()
+    if bank is None:
+        return ("Search Error", "The local question bank is unavailable.")
+    try:
+        with metrics.span("search"):
+            questions = bank.search(text, question_type, -1 if count is None else count)
+    finally:
+        bank.close()
+    if not questions:
+        return ("No Matches", f'No saved questions match "{text}".')
+
+    for question in questions:
+        emit(question)
+    metrics.incr("questions_served", len(questions), source="search")
+    return None
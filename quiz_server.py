@@ -0,0 +1,413 @@
+"""LAN quiz server: one question set, many players on the local network.
+
+The server loads a single quiz through the usual path (local bank first,
+then one rate-limited trip to the trivia API), so a classroom of players
+costs one API request instead of one per seat. Players connect over TCP
+and speak newline-delimited JSON; each question is broadcast to everyone
+at once, answers are timed on the server's monotonic clock, and the
+standings are published after every question.
+
+    python quiz_server.py serve --category 9 --count 10 --players 30
+    python quiz_server.py join 192.168.1.20 --name alice
+
+Messages from the server: welcome, question, ack, reveal, final.
+Messages from players: join {name}, answer {index, answer}.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+
+import metrics
+from history import open_history
+from quiz_engine import QuizEngine, load_questions, result_band
+
+DEFAULT_PORT = 8766  # Clear of opentdb_stub.py, which defaults to 8765
+QUESTION_SECONDS = 20.0  # Time allowed per question
+REVEAL_SECONDS = 4.0  # Pause on the answer and standings before the next question
+LOBBY_SECONDS = 60.0  # Start anyway after this long, with however many have joined
+FLUSH_SECONDS = 5.0  # A player whose connection stays backed up this long is dropped
+LEADERBOARD_SIZE = 10  # Rows of the standings broadcast to everyone
+MAX_LINE = 4096  # Longest message a player may send
+MAX_NAME = 24
+BACKLOG = 1024  # Pending connections; a whole class joins at the same moment
+
+def encode(message):
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode("utf-8") + b"\n"
+
+class Player:
+    """One seat: its connection, score and total answer time"""
+
+    def __init__(self, name, writer):
+        self.name = name
+        self.writer = writer
+        self.score = 0
+        self.response_ms = 0
+        self.answered = 0
+        self.session_id = None
+
+    @property
+    def connected(self):
+        return self.writer is not None and not self.writer.is_closing()
+
+    def send(self, data):
+        """Queue bytes for the player; slow readers are flushed by QuizServer.flush()"""
+        if self.connected:
+            self.writer.write(data)
+
+# ------------------- Quiz Server ------------------- #
+class QuizServer:
+    """Runs one quiz for every connected player.
+
+    engine holds the question set (loaded before play starts) and fixes the
+    answer order, so every player sees the same options. Answers are logged
+    to history when one is given, under each player's name.
+    """
+
+    def __init__(self, engine, question_seconds=QUESTION_SECONDS, reveal_seconds=REVEAL_SECONDS,
+                 history=None, category_id=None, source="lan"):
+        self.engine = engine
+        self.category_id = category_id
+        self.question_seconds = question_seconds
+        self.reveal_seconds = reveal_seconds
+        self.history = history
+        self.source = source
+        self.players = {}
+        self.joined = asyncio.Event()
+        self.min_players = 1
+
+        # State of the question being played
+        self.index = None
+        self.asked_at = None
+        self.answers = {}
+        self.all_answered = asyncio.Event()
+
+    # Connections
+    async def handle_client(self, reader, writer):
+        player = None
+        try:
+            line = await reader.readline()
+            message = json.loads(line) if line else None
+            if not isinstance(message, dict) or message.get("type") != "join":
+                return
+            player = self.add_player(str(message.get("name") or "player"), writer)
+
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(message, dict) and message.get("type") == "answer":
+                    self.take_answer(player, message.get("index"), message.get("answer"))
+        except (ValueError, ConnectionError):
+            # Oversized line or dropped connection
+            pass
+        finally:
+            if player and player.writer is writer:
+                player.writer = None
+                self.check_all_answered()
+            writer.close()
+
+    def add_player(self, name, writer):
+        """Seat a player, or reconnect one whose connection dropped"""
+        name = name.strip()[:MAX_NAME] or "player"
+        player = self.players.get(name)
+        if player and player.connected:
+            suffix = 2
+            while f"{name} ({suffix})" in self.players:
+                suffix += 1
+            name = f"{name} ({suffix})"
+            player = None
+        if player:
+            player.writer = writer
+        else:
+            player = self.players[name] = Player(name, writer)
+
+        player.send(encode({"type": "welcome", "name": name, "total": self.engine.total}))
+        if self.index is not None:
+            # Joined mid-question: they can still answer it
+            player.send(self.question_message(self.index))
+        metrics.incr("server_joins")
+        if self.connected_count() >= self.min_players:
+            self.joined.set()
+        return player
+
+    def connected_count(self):
+        return sum(1 for player in self.players.values() if player.connected)
+
+    def broadcast(self, data):
+        for player in self.players.values():
+            player.send(data)
+
+    async def flush(self):
+        """Wait for every connection's buffer to drain, dropping any that fail or stall"""
+        # Keep the writers themselves: a player can disconnect or reconnect meanwhile
+        writers = [player.writer for player in self.players.values() if player.connected]
+        results = await asyncio.gather(
+            *(asyncio.wait_for(writer.drain(), FLUSH_SECONDS) for writer in writers),
+            return_exceptions=True
+        )
+        for writer, result in zip(writers, results):
+            if isinstance(result, Exception):
+                writer.close()
+
+    # Answers
+    def take_answer(self, player, index, answer):
+        """Time and store a player's first answer to the current question"""
+        # 0.0 and False compare equal to 0 but must not be used as indexes
+        if not isinstance(index, int) or isinstance(index, bool):
+            return
+        if index != self.index or player.name in self.answers:
+            return
+        if answer not in self.engine.choices[index]:
+            return
+        seconds = asyncio.get_running_loop().time() - self.asked_at
+        self.answers[player.name] = (answer, seconds)
+        player.send(encode({"type": "ack", "index": index}))
+        metrics.incr("server_answers")
+        self.check_all_answered()
+
+    def check_all_answered(self):
+        if self.index is not None and all(
+            name in self.answers for name, player in self.players.items() if player.connected
+        ):
+            self.all_answered.set()
+
+    # Game flow
+    def question_message(self, index):
+        question = self.engine.questions[index]
+        return encode({
+            "type": "question", "index": index, "total": self.engine.total,
+            "category": question.category, "difficulty": question.difficulty,
+            "question": question.text, "choices": self.engine.choices[index],
+            "seconds": self.question_seconds,
+        })
+
+    def standings(self):
+        return sorted(self.players.values(), key=lambda player: (-player.score, player.response_ms))
+
+    def leaderboard(self, ranked):
+        return [
+            {"name": player.name, "score": player.score, "seconds": round(player.response_ms / 1000, 1)}
+            for player in ranked[:LEADERBOARD_SIZE]
+        ]
+
+    async def wait_for_players(self, min_players, lobby_seconds):
+        """Return once min_players are connected or the lobby time runs out"""
+        self.min_players = min_players
+        if self.connected_count() >= min_players:
+            return
+        try:
+            await asyncio.wait_for(self.joined.wait(), lobby_seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def play(self):
+        """Ask every question in turn, then send each player their result"""
+        loop = asyncio.get_running_loop()
+        engine = self.engine
+        for index, question in enumerate(engine.questions):
+            self.answers = {}
+            self.all_answered.clear()
+            self.index = index
+            self.asked_at = loop.time()
+            with metrics.span("server_broadcast"):
+                self.broadcast(self.question_message(index))
+                await self.flush()
+            try:
+                await asyncio.wait_for(self.all_answered.wait(), self.question_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self.index = None
+
+            self.score_question(question)
+            ranked = self.standings()
+            board = self.leaderboard(ranked)
+            for rank, player in enumerate(ranked, 1):
+                answer = self.answers.get(player.name)
+                player.send(encode({
+                    "type": "reveal", "index": index, "correct_answer": question.correct_answer,
+                    "correct": bool(answer) and answer[0] == question.correct_answer,
+                    "score": player.score, "rank": rank, "players": len(ranked),
+                    "leaderboard": board,
+                }))
+            await self.flush()
+            if index + 1 < len(engine.questions):
+                await asyncio.sleep(self.reveal_seconds)
+
+        total = len(engine.questions)
+        ranked = self.standings()
+        board = self.leaderboard(ranked)
+        for rank, player in enumerate(ranked, 1):
+            percentage = player.score / total * 100 if total else 0.0
+            player.send(encode({
+                "type": "final", "score": player.score, "total": total, "rank": rank,
+                "message": result_band(percentage)[1], "leaderboard": board,
+            }))
+            if self.history and player.session_id is not None:
+                self.history.finish_session(player.session_id, player.score, total)
+        await self.flush()
+
+    def score_question(self, question):
+        """Fold the current answers into the scores and the attempt history"""
+        for name, (answer, seconds) in self.answers.items():
+            player = self.players[name]
+            player.score += answer == question.correct_answer
+            player.response_ms += int(round(seconds * 1000))
+            player.answered += 1
+
+        history = self.history
+        if not history or not self.answers:
+            return
+        for name in self.answers:
+            player = self.players[name]
+            if player.session_id is None:
+                player.session_id = history.start_session(
+                    name, self.source, self.category_id, question.type
+                )
+        # One transaction for the whole room rather than one per answer
+        now = time.time()
+        with history.lock, history.conn:
+            for name, (answer, seconds) in self.answers.items():
+                history.apply_answer(
+                    self.players[name].session_id, name, question,
+                    answer == question.correct_answer, seconds, now
+                )
+
+    def close(self):
+        for player in self.players.values():
+            if player.connected:
+                player.writer.close()
+
+async def load_quiz(category_id, question_type, count):
+    """Load one question set for the room; returns (engine, error)"""
+    engine = QuizEngine(count)
+    error = await asyncio.to_thread(load_questions, category_id, question_type, count, engine.add_question)
+    engine.finish_loading()
+    if not engine.questions:
+        return None, error or ("Error", "No questions found for these settings.")
+    return engine, None
+
+async def serve(args):
+    print(f"Loading {args.count} questions...")
+    engine, error = await load_quiz(args.category, args.type, args.count)
+    if engine is None:
+        print(f"{error[0]}: {error[1]}", file=sys.stderr)
+        return 1
+
+    history = None if args.no_history else open_history()
+    quiz = QuizServer(engine, args.question_seconds, args.reveal_seconds, history, args.category)
+    server = await asyncio.start_server(
+        quiz.handle_client, args.host, args.port, limit=MAX_LINE, backlog=BACKLOG
+    )
+    port = server.sockets[0].getsockname()[1]
+    print(f"Serving {engine.total} questions on port {port}; waiting for {args.players} players "
+          f"(up to {args.lobby_seconds:.0f}s)")
+    try:
+        async with server:
+            await quiz.wait_for_players(args.players, args.lobby_seconds)
+            print(f"Starting with {quiz.connected_count()} players")
+            await quiz.play()
+            for rank, player in enumerate(quiz.standings()[:LEADERBOARD_SIZE], 1):
+                print(f"{rank:>3}. {player.name:<{MAX_NAME}} {player.score:>3}  "
+                      f"{player.response_ms / 1000:6.1f}s")
+            quiz.close()
+    finally:
+        if history:
+            history.close()
+    return 0
+
+# ------------------- Terminal Player ------------------- #
+def read_lines(loop, lines):
+    """Feed stdin lines into an asyncio queue from a daemon thread"""
+    for line in sys.stdin:
+        loop.call_soon_threadsafe(lines.put_nowait, line.strip())
+
+async def join(args):
+    loop = asyncio.get_running_loop()
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    writer.write(encode({"type": "join", "name": args.name}))
+    lines = asyncio.Queue()
+    threading.Thread(target=read_lines, args=(loop, lines), daemon=True).start()
+
+    choices = None
+    index = None
+
+    async def answer_from_keyboard():
+        while True:
+            text = await lines.get()
+            if choices and text.isdigit() and 1 <= int(text) <= len(choices):
+                writer.write(encode({"type": "answer", "index": index, "answer": choices[int(text) - 1]}))
+                await writer.drain()
+
+    keyboard = asyncio.create_task(answer_from_keyboard())
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                print("Disconnected from the server")
+                return 1
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "welcome":
+                print(f"Joined as {message['name']}; waiting for the quiz to start")
+            elif kind == "question":
+                index, choices = message["index"], message["choices"]
+                print(f"\nQuestion {index + 1}/{message['total']} ({message['seconds']:.0f}s): "
+                      f"{message['question']}")
+                for i, choice in enumerate(choices, 1):
+                    print(f"  {i}. {choice}")
+            elif kind == "ack":
+                choices = None
+                print("Answer locked in")
+            elif kind == "reveal":
+                choices = None
+                verdict = "Correct!" if message["correct"] else f"The answer was {message['correct_answer']}"
+                print(f"{verdict}  Score {message['score']}, rank {message['rank']}/{message['players']}")
+            elif kind == "final":
+                print(f"\n{message['message']} {message['score']}/{message['total']}, "
+                      f"rank {message['rank']}")
+                for rank, row in enumerate(message["leaderboard"], 1):
+                    print(f"{rank:>3}. {row['name']:<{MAX_NAME}} {row['score']:>3}  {row['seconds']:6.1f}s")
+                return 0
+    finally:
+        keyboard.cancel()
+        writer.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Host or join a quiz on the local network")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="load a quiz and host it")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--category", type=int, default=9, help="OpenTDB category id")
+    serve_parser.add_argument("--type", default="multiple", choices=["multiple", "boolean"])
+    serve_parser.add_argument("--count", type=int, default=10)
+    serve_parser.add_argument("--players", type=int, default=2, help="start once this many have joined")
+    serve_parser.add_argument("--lobby-seconds", type=float, default=LOBBY_SECONDS)
+    serve_parser.add_argument("--question-seconds", type=float, default=QUESTION_SECONDS)
+    serve_parser.add_argument("--reveal-seconds", type=float, default=REVEAL_SECONDS)
+    serve_parser.add_argument("--no-history", action="store_true", help="do not log answers locally")
+
+    join_parser = commands.add_parser("join", help="play in a terminal")
+    join_parser.add_argument("host")
+    join_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    join_parser.add_argument("--name", required=True)
+    args = parser.parse_args()
+
+    metrics.enable_from_env()
+    try:
+        sys.exit(asyncio.run(serve(args) if args.command == "serve" else join(args)))
+    except (OSError, KeyboardInterrupt) as e:
+        if isinstance(e, OSError):
+            print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import collections
+import heapq
+import itertools
+import random
+import time
+
+# Seconds until a question is asked again after its first correct answer;
+# each further correct answer multiplies the interval by the ease factor
+FIRST_INTERVAL = 24 * 60 * 60
+RELEARN_INTERVAL = 10 * 60  # A missed question comes back after ten minutes
+EASE = {"easy": 3.0, "medium": 2.5, "hard": 2.0}
+DEFAULT_EASE = 2.5
+MISS_EASE_PENALTY = 0.2
+MIN_EASE = 1.3
+
+# New questions are introduced easiest first
+DIFFICULTY_RANK = {"easy": 0, "medium": 1, "hard": 2}
+
+ReviewState = collections.namedtuple("ReviewState", "due_at interval misses streak")
+NEW_STATE = ReviewState(None, 0.0, 0, 0)
+
+def next_state(state, difficulty, correct, now):
+    """The review state after answering a question"""
+    if not correct:
+        return ReviewState(now + RELEARN_INTERVAL, RELEARN_INTERVAL, state.misses + 1, 0)
+    if state.streak == 0:
+        interval = FIRST_INTERVAL
+    else:
+        ease = max(MIN_EASE, EASE.get(difficulty, DEFAULT_EASE) - MISS_EASE_PENALTY * state.misses)
+        interval = state.interval * ease
+    return ReviewState(now + interval, interval, state.misses, state.streak + 1)
+
+# ------------------- Review Scheduler ------------------- #
+class ReviewScheduler:
+    """Spaced-repetition order over a set of saved questions.
+
+    Questions sit in a heap keyed by when they are due for review, then by
+    how often they were missed and by difficulty, so picking the next one
+    and rescheduling an answered one are both O(log n). Overdue questions
+    come first, then unseen ones (easiest first), then those not yet due.
+
+    candidates is an iterable of (content_hash, difficulty) and
+    load_question fetches the Question for a hash. States are only updated
+    in memory here: the attempt history folds every logged answer into the
+    stored states, in review mode and in normal quizzes alike.
+    """
+
+    def __init__(self, candidates, states, load_question, now=None, rng=None):
+        now = time.time() if now is None else now
+        rng = rng or random.Random()
+        self.load_question = load_question
+        self.states = states
+        self.difficulties = {}
+        self.counter = itertools.count()
+
+        self.heap = []
+        for digest, difficulty in candidates:
+            self.difficulties[digest] = difficulty
+            state = states.get(digest, NEW_STATE)
+            self.heap.append(self.entry(digest, state, now, rng.random()))
+        heapq.heapify(self.heap)
+
+    def __len__(self):
+        return len(self.heap)
+
+    def entry(self, digest, state, now, tiebreak=None):
+        due_at = now if state.due_at is None else state.due_at
+        rank = DIFFICULTY_RANK.get(self.difficulties[digest], 1)
+        # Among equally due questions, the most missed and then the easiest go first
+        return (due_at, -state.misses, rank, tiebreak if tiebreak is not None else next(self.counter), digest)
+
+    def next_question(self):
+        """Remove and return the question most in need of review, or None"""
+        while self.heap:
+            digest = heapq.heappop(self.heap)[-1]
+            question = self.load_question(digest)
+            if question is not None:
+                return question
+        return None
+
+    def record(self, question, correct, now=None):
+        """Reschedule a question after it has been answered"""
+        now = time.time() if now is None else now
+        digest = question.content_hash
+        if digest not in self.difficulties:
+            return
+        state = next_state(self.states.get(digest, NEW_STATE), self.difficulties[digest], correct, now)
+        self.states[digest] = state
+        heapq.heappush(self.heap, self.entry(digest, state, now))
+
+def open_review_scheduler(bank, history, player, category_id, question_type):
+    """A ReviewScheduler over the bank's questions for these settings.
+
+    States come from every answer in the player's history, so questions
+    missed in normal quizzes are due for review too.
+    """
+    states = history.review_states(player) if history else {}
+    return ReviewScheduler(bank.review_candidates(category_id, question_type), states, bank.get_question)
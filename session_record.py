@@ -0,0 +1,88 @@
+"""Quiz session recordings for deterministic replay.
+
+A recording holds everything needed to play a quiz again exactly: the quiz
+settings, the seed of the engine's answer shuffle, every question in the
+order it was asked, and the player's input as timestamped events. Start the
+app with ``--record DIR`` and each finished quiz is written to DIR as
+session-<time>.json; benchmarks/replay_session.py drives a real QuizWindow
+through it.
+
+Event times are seconds on the monotonic clock since the quiz window
+opened. Kinds are "answer" (with the question index and the answer text),
+"timeout" (the question's time limit ran out), "quiz_timeout" (the whole
+quiz's did) and "next" (the feedback was dismissed). The final score is
+kept too, so a replay can check that it ended the same way.
+"""
+import json
+import os
+import tempfile
+import time
+
+from question_pack import PackError, dict_to_question, question_to_dict
+
+RECORDING_FORMAT = "quizmaster-session"
+RECORDING_VERSION = 1
+
+class RecordingError(Exception):
+    """A file that is not a readable session recording"""
+
+class SessionRecording:
+    def __init__(self, seed, settings, questions=None, events=None, score=None):
+        self.seed = seed
+        self.settings = settings
+        self.questions = questions or []
+        self.events = events or []
+        self.score = score
+        self.started = time.perf_counter()
+
+    def add_event(self, kind, **fields):
+        fields.update(kind=kind, t=round(time.perf_counter() - self.started, 6))
+        self.events.append(fields)
+
+    def to_json(self, questions, score):
+        category_id = self.settings.get("category_id")
+        return {
+            "format": RECORDING_FORMAT,
+            "version": RECORDING_VERSION,
+            "recorded_at": time.time(),
+            "seed": self.seed,
+            "settings": self.settings,
+            "questions": [question_to_dict(category_id, question) for question in questions],
+            "events": self.events,
+            "score": score,
+        }
+
+    def save(self, directory, questions, score):
+        """Write the recording atomically and return its path"""
+        os.makedirs(directory, exist_ok=True)
+        now = time.time()
+        name = time.strftime("session-%Y%m%d-%H%M%S", time.localtime(now))
+        path = os.path.join(directory, f"{name}-{int(now * 1000) % 1000:03d}.json")
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".session.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.to_json(questions, score), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return path
+
+def load_recording(path):
+    """Read a recording back; its questions are Question objects"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RecordingError(f"Cannot read recording: {e}")
+    if not isinstance(data, dict) or data.get("format") != RECORDING_FORMAT:
+        raise RecordingError("Not a session recording")
+    if data.get("version") != RECORDING_VERSION:
+        raise RecordingError(f"Unsupported recording version {data.get('version')}")
+    try:
+        questions = [dict_to_question(record)[1] for record in data["questions"]]
+        return SessionRecording(
+            data["seed"], data["settings"], questions, data["events"], data.get("score")
+        )
+    except (KeyError, TypeError, PackError) as e:
+        raise RecordingError(f"Malformed recording: {e}")
@@ -0,0 +1,42 @@
+import json
+import os
+import tempfile
+import time
+
+# ------------------- Local Data Directory ------------------- #
+def data_dir():
+    """Return the directory used for caches and local data, creating it if needed"""
+    path = os.environ.get("QUIZMASTER_HOME") or os.path.join(os.path.expanduser("~"), ".quizmaster")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+# ------------------- JSON File Cache ------------------- #
+def read_json_cache(name, ttl):
+    """Read a cached JSON document.
+
+    Returns (data, is_fresh). data is None when there is no usable cache;
+    is_fresh is False once the entry is older than ttl seconds.
+    """
+    path = os.path.join(data_dir(), name)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        data = entry["data"]
+        saved_at = float(entry["saved_at"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, False
+
+    return data, (time.time() - saved_at) < ttl
+
+def write_json_cache(name, data):
+    """Atomically replace a cached JSON document (failures are ignored)"""
+    tmp_path = None
+    try:
+        directory = data_dir()
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"saved_at": time.time(), "data": data}, f)
+        os.replace(tmp_path, os.path.join(directory, name))
+    except OSError:
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,90 @@
+import math
+
+import pytest
+
+from countdown import Countdown, format_clock
+
+class FakeTimers:
+    """A clock plus after()/after_cancel() whose callbacks can be made to run late"""
+
+    def __init__(self, start=100.3, lateness=0.0):
+        self.now = start
+        self.lateness = lateness
+        self.timers = {}
+        self.next_id = 0
+        self.wakes = []
+
+    def clock(self):
+        return self.now
+
+    def after(self, ms, callback):
+        self.next_id += 1
+        self.timers[self.next_id] = (self.now + ms / 1000, callback)
+        return self.next_id
+
+    def after_cancel(self, timer_id):
+        self.timers.pop(timer_id, None)
+
+    def run(self):
+        while self.timers:
+            timer_id = min(self.timers, key=lambda i: self.timers[i][0])
+            due, callback = self.timers.pop(timer_id)
+            self.now = due + self.lateness
+            self.wakes.append(self.now)
+            callback()
+
+def start_countdown(timers, seconds=10):
+    ticks, expired = [], []
+    countdown = Countdown(
+        timers.after, timers.after_cancel, seconds, ticks.append,
+        lambda: expired.append(timers.now), clock=timers.clock
+    ).start()
+    return countdown, ticks, expired
+
+def test_ticks_land_on_whole_seconds():
+    timers = FakeTimers()
+    countdown, ticks, expired = start_countdown(timers)
+    timers.run()
+
+    assert ticks == list(range(10, -1, -1))
+    for wake in timers.wakes:
+        elapsed = wake - 100.3
+        assert elapsed == pytest.approx(round(elapsed), abs=0.001)
+    assert expired == [pytest.approx(110.3, abs=0.001)]
+
+def test_late_callbacks_do_not_accumulate_drift():
+    timers = FakeTimers(lateness=0.25)
+    countdown, ticks, expired = start_countdown(timers)
+    timers.run()
+
+    # Every tick shows the true time left, however late it ran
+    for wake, shown in zip(timers.wakes, ticks[1:]):
+        assert shown == max(0, math.ceil(110.3 - wake))
+    # A chain of one-second timers would be 10 x 0.25 s late by now
+    assert expired[0] - 110.3 <= 0.25 + 0.001
+    assert len(ticks) <= 11
+
+def test_expiry_fires_exactly_once():
+    timers = FakeTimers(lateness=0.6)
+    countdown, ticks, expired = start_countdown(timers, seconds=3)
+    timers.run()
+
+    assert len(expired) == 1
+    assert not countdown.running and countdown.remaining() == 0.0
+    # A stray tick or stop after expiry changes nothing
+    countdown.tick()
+    countdown.stop()
+    assert len(expired) == 1 and not timers.timers
+
+def test_stop_cancels_the_pending_tick():
+    timers = FakeTimers()
+    countdown, ticks, expired = start_countdown(timers)
+    countdown.stop()
+    timers.run()
+
+    assert ticks == [10] and expired == []
+
+def test_format_clock():
+    assert format_clock(0) == "0:00"
+    assert format_clock(59) == "0:59"
+    assert format_clock(605) == "10:05"
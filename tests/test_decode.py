@@ -0,0 +1,46 @@
+import html
+
+import pytest
+
+from opentdb import decode_questions
+
+def raw(question, correct, incorrect, question_type="multiple", category="Science &amp; Nature"):
+    return {
+        "type": question_type, "difficulty": "medium", "category": category,
+        "question": question, "correct_answer": correct, "incorrect_answers": incorrect,
+    }
+
+ENTITY_HEAVY = [
+    raw("What&#039;s &quot;&lt;b&gt;&quot; in HTML?", "Bold &amp; strong", ["&eacute;t&eacute;", "&#x41;&#66;", "&amp"]),
+    # Fields ending or starting mid-entity must not join into one entity
+    raw("Ends with &", "#39;starts like an entity", ["&amp;amp;", "&#38", ""]),
+    raw("&copy &reg; &nbsp;&hellip; &#128512; &#0;", "True", ["False"], "boolean", "Entertainment: Film"),
+    raw("Plain text", "Café", ["naïve", "&unknown;", "&;"]),
+]
+
+def expected(results):
+    return [
+        (html.unescape(q["category"]), html.unescape(q["question"]),
+         html.unescape(q["correct_answer"]), tuple(html.unescape(a) for a in q["incorrect_answers"]))
+        for q in results
+    ]
+
+def actual(questions):
+    return [(q.category, q.text, q.correct_answer, q.incorrect_answers) for q in questions]
+
+@pytest.mark.parametrize("results", [
+    ENTITY_HEAVY,
+    # A field containing the separator takes the per-field fallback
+    ENTITY_HEAVY + [raw("Null\x00byte &amp; more", "a\x00b", ["&lt;\x00&gt;"])],
+    [raw("\x00", "\x00\x00", ["x"])],
+], ids=["entities", "nul-in-field", "only-nuls"])
+def test_matches_per_field_unescape(results):
+    assert actual(decode_questions(results)) == expected(results)
+
+def test_keeps_question_type_and_difficulty():
+    (question,) = decode_questions([raw("Q", "True", ["False"], "boolean")])
+    assert question.type == "boolean"
+    assert question.difficulty == "medium"
+
+def test_empty_payload():
+    assert decode_questions([]) == []
@@ -0,0 +1,87 @@
+import random
+import time
+import types
+
+import pytest
+
+from history import ALL_PLAYERS, TREND_DAYS, Aggregate, AttemptHistory, day_of
+from question_model import Question
+
+CATEGORIES = ("History", "Science & Nature", "Entertainment: Film")
+
+class RecomputedHistory:
+    """The AttemptHistory read API, answered by aggregating the answers log directly"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def aggregate(self, where, params):
+        row = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(correct), 0), COALESCE(SUM(response_ms), 0) "
+            f"FROM answers WHERE {where}", params
+        ).fetchone()
+        return Aggregate(*row)
+
+    def player_filter(self, player):
+        return ("1", ()) if player == ALL_PLAYERS else ("player = ?", (player,))
+
+    def totals(self, player, dimension="all", value=""):
+        where, params = self.player_filter(player)
+        if dimension != "all":
+            where += f" AND COALESCE({dimension}, '') = ?"
+            params += (value,)
+        return self.aggregate(where, params)
+
+    def breakdown(self, player, dimension):
+        where, params = self.player_filter(player)
+        values = [row[0] for row in self.conn.execute(
+            f"SELECT DISTINCT COALESCE({dimension}, '') FROM answers WHERE {where}", params
+        )]
+        return {value: self.totals(player, dimension, value) for value in values}
+
+    def recent(self, player, days=TREND_DAYS):
+        where, params = self.player_filter(player)
+        since = day_of(time.time() - (days - 1) * 86400)
+        rows = self.conn.execute(
+            f"SELECT answered_at, correct, response_ms FROM answers WHERE {where}", params
+        ).fetchall()
+        kept = [row for row in rows if day_of(row[0]) >= since]
+        return Aggregate(len(kept), sum(row[1] for row in kept), sum(row[2] for row in kept))
+
+@pytest.fixture
+def history(tmp_path):
+    history = AttemptHistory(str(tmp_path / "history.db"))
+    rng = random.Random(7)
+    now = time.time()
+    for round_number in range(12):
+        player = ("alice", "bob")[round_number % 2]
+        session = history.start_session(player, "opentdb", 9, "multiple")
+        for i in range(8):
+            category = rng.choice(CATEGORIES)
+            question = Question("multiple", rng.choice(("easy", "medium", "hard", None)), category,
+                                f"Q{round_number}-{i}", "right", ["a", "b", "c"], f"hash{round_number}-{i}")
+            # Spread over three weeks so the trend window cuts through the log
+            answered_at = now - rng.uniform(0, 21) * 86400
+            with history.lock, history.conn:
+                history.apply_answer(session, player, question, rng.random() < 0.6,
+                                     rng.uniform(0.5, 12), answered_at)
+        history.finish_session(session, 0, 8)
+    yield history
+    history.close()
+
+@pytest.mark.parametrize("player", ["alice", "bob", ALL_PLAYERS])
+def test_running_totals_match_a_recomputation(history, player):
+    recomputed = RecomputedHistory(history.conn)
+
+    assert history.totals(player) == recomputed.totals(player)
+    for dimension in ("category", "difficulty"):
+        assert history.breakdown(player, dimension) == recomputed.breakdown(player, dimension)
+    assert history.recent(player) == recomputed.recent(player)
+
+def test_history_summary_matches_a_recomputation(history):
+    main = pytest.importorskip("main")
+    summary = main.QuizWindow.history_summary
+    real = summary(types.SimpleNamespace(history=history, player="alice"))
+    recomputed = summary(types.SimpleNamespace(history=RecomputedHistory(history.conn), player="alice"))
+
+    assert real and real == recomputed
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from opentdb import OpenTDBClient, RequestCancelled, RequestScheduler
+from opentdb_stub import OpenTDBStub
+
+@pytest.fixture
+def stub():
+    with OpenTDBStub(per_combination=20, rate_limit=0) as stub:
+        yield stub
+
+@pytest.fixture
+def client(stub):
+    return OpenTDBClient(stub.base_url, scheduler=RequestScheduler(interval=0))
+
+def question_requests(stub):
+    return [params for endpoint, params in stub.state.request_log if endpoint == "api.php"]
+
+def test_rate_limited_request_is_retried(stub, client):
+    stub.state.force_codes(5)
+    data = client.questions(5, 9, "multiple")
+    assert data["response_code"] == 0
+    assert len(data["results"]) == 5
+    assert len(question_requests(stub)) == 2
+
+def test_missing_token_is_replaced(stub, client):
+    old_token = client.session_token()
+    stub.state.force_codes(3)
+    data = client.questions(5, 9, "multiple")
+    assert len(data["results"]) == 5
+    assert client.token != old_token
+    assert question_requests(stub)[-1]["token"] == client.token
+
+def test_exhausted_token_is_reset(stub, client):
+    first = client.questions(5, 9, "multiple")
+    token = client.token
+    stub.state.force_codes(4)
+    again = client.questions(5, 9, "multiple")
+    # Same token, reset: the questions it had already seen are served again
+    assert client.token == token
+    assert again["results"] == first["results"]
+
+def test_cancelled_requests_give_back_their_slots():
+    scheduler = RequestScheduler(interval=0.2)
+    scheduler.acquire()
+
+    cancel = threading.Event()
+    cancelled = []
+
+    def queued():
+        try:
+            scheduler.acquire(cancel_event=cancel)
+        except RequestCancelled:
+            cancelled.append(True)
+
+    threads = [threading.Thread(target=queued) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    cancel.set()
+    for thread in threads:
+        thread.join()
+    assert len(cancelled) == 3
+
+    # Only one interval after the request that was actually sent, not four
+    wait = scheduler.acquire()
+    assert wait < 0.2
@@ -0,0 +1,43 @@
+import gzip
+import json
+
+import pytest
+
+from opentdb import decode_questions
+from opentdb_stub import STUB_CATEGORIES, build_questions
+from question_pack import (
+    PACK_FORMAT, PACK_SUFFIX, PACK_VERSION, PackError, QuestionPack, find_packs, write_pack
+)
+
+def test_count_index_counts_each_question_type_separately(tmp_path):
+    path = tmp_path / "fixture.qpack"
+    category_ids = {name: cid for cid, name in STUB_CATEGORIES.items()}
+    # 3 questions per category/type/difficulty, then drop category 9's True/False ones
+    items = [
+        (category_ids[question.category], question)
+        for question in decode_questions(build_questions(3))
+        if not (question.category == STUB_CATEGORIES[9] and question.type == "boolean")
+    ]
+    write_pack(str(path), items, block_records=4)
+    pack = QuestionPack(str(path))
+
+    assert pack.count_index("multiple").available(9) == 9
+    assert pack.count_index("boolean").available(9) == 0
+    assert pack.count_index("boolean").available_across([9, 11]) == 9
+
+@pytest.mark.parametrize("header", [
+    {},
+    {"count": 0, "categories": {}},
+    {"count": 0, "categories": {}, "blocks": [{"offset": 0}]},
+    {"count": 0, "categories": {"nine": "General"}, "blocks": []},
+])
+def test_malformed_header_is_a_pack_error(tmp_path, monkeypatch, header):
+    monkeypatch.setenv("QUIZMASTER_HOME", str(tmp_path))
+    header = {"format": PACK_FORMAT, "version": PACK_VERSION, **header}
+    path = tmp_path / "packs" / ("broken" + PACK_SUFFIX)
+    path.parent.mkdir()
+    path.write_bytes(gzip.compress(json.dumps(header).encode("utf-8") + b"\n"))
+
+    with pytest.raises(PackError):
+        QuestionPack(str(path))
+    assert find_packs() == {}
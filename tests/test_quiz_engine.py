@@ -0,0 +1,56 @@
+import pytest
+
+from opentdb import client
+from opentdb_stub import OpenTDBStub
+from question_model import Question
+from quiz_engine import load_mixed_questions, load_questions
+
+def make_loader(available):
+    """A load() handing out available[category_id] distinct questions, at most count per call"""
+    served = dict.fromkeys(available, 0)
+
+    def load(category_id, count, emit):
+        left = available[category_id] - served[category_id]
+        for _ in range(left if count is None else min(count, left)):
+            served[category_id] += 1
+            emit(Question("multiple", "easy", f"Category {category_id}",
+                          f"Q{category_id}-{served[category_id]}", "right", ["a", "b", "c"]))
+        return None
+    return load
+
+def test_mixed_marathon_loads_every_question():
+    emitted = []
+    error = load_mixed_questions((1, 2), None, make_loader({1: 5, 2: 3}), emitted.append)
+    assert error is None
+    assert len(emitted) == 8
+
+def test_mixed_quiz_tops_up_from_categories_with_spare_questions():
+    emitted = []
+    error = load_mixed_questions((1, 2), 10, make_loader({1: 20, 2: 2}), emitted.append)
+    assert error is None
+    assert len(emitted) == 10
+    assert sum(q.category == "Category 2" for q in emitted) == 2
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUIZMASTER_HOME", str(tmp_path))
+    with OpenTDBStub(per_combination=5, rate_limit=0) as stub:
+        monkeypatch.setattr(client, "base_url", stub.base_url)
+        monkeypatch.setattr(client.scheduler, "interval", 0)
+        yield stub
+
+def test_marathon_plays_the_whole_category_after_earlier_rounds(stub):
+    for _ in range(2):
+        assert load_questions(9, "multiple", 5, lambda question: None) is None
+    played_before = len(stub.state.request_log)
+
+    emitted = []
+    assert load_questions(9, "multiple", None, emitted.append) is None
+
+    # 5 per difficulty in the stub: every multiple choice question, once each
+    assert len({question.content_hash for question in emitted}) == len(emitted) == 15
+    assert all(question.type == "multiple" for question in emitted)
+    # Sized from the category count: one request for both types, no probing
+    requests = [params for endpoint, params in stub.state.request_log[played_before:]
+                if endpoint == "api.php"]
+    assert [params["amount"] for params in requests] == ["30"]
@@ -0,0 +1,74 @@
+import asyncio
+
+from question_model import Question
+from quiz_engine import QuizEngine
+from quiz_server import Player, QuizServer
+
+class FakeWriter:
+    def __init__(self, on_drain=None):
+        self.on_drain = on_drain
+        self.closed = False
+
+    def is_closing(self):
+        return self.closed
+
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        if self.on_drain:
+            self.on_drain()
+
+    def close(self):
+        self.closed = True
+
+def test_flush_survives_a_player_dropping_during_drain():
+    async def run():
+        server = QuizServer(QuizEngine())
+        player = server.players["alice"] = Player("alice", None)
+
+        def reset():
+            # What handle_client's cleanup does when the connection resets
+            player.writer = None
+            raise ConnectionResetError()
+
+        writer = player.writer = FakeWriter(reset)
+        await server.flush()
+        return writer
+
+    assert asyncio.run(run()).closed
+
+def test_flush_leaves_a_reconnected_player_alone():
+    async def run():
+        server = QuizServer(QuizEngine())
+        player = server.players["alice"] = Player("alice", None)
+        reconnected = FakeWriter()
+
+        def reconnect():
+            player.writer = reconnected
+            raise ConnectionResetError()
+
+        old = player.writer = FakeWriter(reconnect)
+        await server.flush()
+        return old, reconnected
+
+    old, reconnected = asyncio.run(run())
+    assert old.closed and not reconnected.closed
+
+def test_answers_with_a_non_integer_index_are_ignored():
+    async def run():
+        engine = QuizEngine()
+        engine.add_question(Question("boolean", "easy", "General", "Is this a test?", "True", ["False"]))
+        server = QuizServer(engine)
+        player = server.players["alice"] = Player("alice", FakeWriter())
+        server.index = 0
+        server.asked_at = asyncio.get_running_loop().time()
+        for index in (0.0, False, "0", None, [0]):
+            server.take_answer(player, index, "True")
+        ignored = dict(server.answers)
+        server.take_answer(player, 0, "True")
+        return ignored, server.answers
+
+    ignored, answers = asyncio.run(run())
+    assert ignored == {}
+    assert list(answers) == ["alice"]
@@ -0,0 +1,57 @@
+import time
+
+import pytest
+
+from history import AttemptHistory
+from question_bank import QuestionBank
+from question_model import Question
+from review import open_review_scheduler
+
+@pytest.fixture
+def stores(tmp_path):
+    bank = QuestionBank(str(tmp_path / "bank.db"))
+    history = AttemptHistory(str(tmp_path / "history.db"))
+    yield bank, history
+    bank.close()
+    history.close()
+
+def make_questions(count):
+    return [
+        Question("multiple", ("easy", "medium", "hard")[i % 3], "History",
+                 f"Question {i}?", f"Right {i}", [f"Wrong {i}a", f"Wrong {i}b", f"Wrong {i}c"])
+        for i in range(count)
+    ]
+
+def play_normal_quiz(history, player, questions, missed, answered_at):
+    session = history.start_session(player, "opentdb", 23, "multiple")
+    with history.lock, history.conn:
+        for question in questions:
+            history.apply_answer(session, player, question, question not in missed, 3.0, answered_at)
+
+def test_question_missed_in_a_normal_quiz_is_reviewed_first(stores):
+    bank, history = stores
+    questions = make_questions(12)
+    bank.add_questions(23, questions)
+    # A normal quiz an hour ago, over half the bank: one miss, the rest right
+    missed = questions[4]
+    play_normal_quiz(history, "alice", questions[:6], {missed}, time.time() - 3600)
+
+    scheduler = open_review_scheduler(bank, history, "alice", 23, "multiple")
+    first = scheduler.next_question()
+    assert first.content_hash == missed.content_hash
+
+    # Questions answered correctly wait behind the ones never asked
+    order = [first] + [scheduler.next_question() for _ in range(len(scheduler))]
+    answered_right = {q.content_hash for q in questions[:6]} - {missed.content_hash}
+    positions = [i for i, q in enumerate(order) if q.content_hash in answered_right]
+    assert positions == list(range(7, 12))
+
+def test_review_states_are_per_player(stores):
+    bank, history = stores
+    questions = make_questions(6)
+    bank.add_questions(23, questions)
+    play_normal_quiz(history, "bob", questions, {questions[5]}, time.time() - 3600)
+
+    states = history.review_states("alice")
+    assert states == {}
+    assert history.review_states("bob")[questions[5].content_hash].misses == 1
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+tk = pytest.importorskip("tkinter")
+
+from opentdb import client
+from opentdb_stub import OpenTDBStub
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUIZMASTER_HOME", str(tmp_path))
+    with OpenTDBStub(rate_limit=0) as stub:
+        monkeypatch.setattr(client, "base_url", stub.base_url)
+        monkeypatch.setattr(client.scheduler, "interval", 0)
+        import main as quiz_main
+        try:
+            app = quiz_main.QuizApp()
+        except tk.TclError as e:
+            pytest.skip(f"No display: {e}")
+        yield app
+        app.root.destroy()
+
+def pump_until(root, condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for the UI"
+        root.update()
+        time.sleep(0.001)
+
+def test_response_time_is_measured_from_the_drawn_question(app):
+    quiz = app.show_quiz(9, "multiple", 3, question_seconds=30)
+    pump_until(app.root, lambda: quiz.question_countdown is not None)
+    drawn = time.perf_counter()
+
+    pump_until(app.root, lambda: time.perf_counter() - drawn >= 0.2)
+    answered = time.perf_counter()
+    quiz.check_answer(quiz.engine.current_question().correct_answer)
+
+    (response_ms,) = quiz.history.conn.execute("SELECT response_ms FROM answers").fetchone()
+    assert abs(response_ms - (answered - drawn) * 1000) < 10
+
+def test_question_timeout_counts_as_a_miss(app):
+    quiz = app.show_quiz(9, "multiple", 3, question_seconds=1)
+    pump_until(app.root, lambda: quiz.awaiting_feedback, timeout=3)
+
+    assert quiz.engine.answers == [(0, None, False)]
+    assert quiz.engine.score == 0